@@ -1,5 +1,114 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
 
+from . import cache, purge, tasks
 from .models import Note
 
-admin.site.register(Note)
+# Наибольший символ Юникода: верхняя граница поиска по началу заголовка.
+MAX_CHAR = '\U0010ffff'
+
+
+def estimate_count(model, using):
+    """Примерное число строк таблицы без COUNT(*) или None.
+
+    PostgreSQL хранит оценку в статистике, на SQLite берётся наибольший
+    id: одна выборка по первичному ключу, пропуски удалённых строк не
+    учитываются.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                (table,),
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                'SELECT MAX({}) FROM {}'.format(
+                    connection.ops.quote_name(model._meta.pk.column),
+                    connection.ops.quote_name(table),
+                )
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который не считает строки большой таблицы.
+
+    Строки считаются не дальше ``limit``: ``COUNT(*)`` по подзапросу с
+    LIMIT. Если их больше, для всей таблицы берётся оценка
+    ``estimate_count``, а для отфильтрованной выборки — ``limit + 1``.
+    """
+    limit = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        count = queryset[:self.limit + 1].count()
+        if count <= self.limit:
+            return count
+        estimate = None
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+        return max(estimate or 0, count)
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'slug', 'author', 'updated_at', 'deleted')
+    list_display_links = ('id', 'title')
+    list_select_related = ('author',)
+    list_filter = ('deleted',)
+    # Сортировка только по индексированным полям.
+    sortable_by = ('id', 'title', 'slug')
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ('author',)
+    search_fields = ('slug', 'title')
+    search_help_text = 'Точный адрес заметки или начало заголовка.'
+    actions = ('mark_deleted', 'restore')
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по индексам: slug целиком, заголовок по началу."""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(
+            Q(slug=term) | Q(title__gte=term, title__lt=term + MAX_CHAR)
+        ), False
+
+    def get_actions(self, request):
+        # Стандартное удаление загружает все выбранные заметки; удалённые
+        # помечаются и удаляются фоновой задачей purge.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def _authors(self, queryset):
+        return set(queryset.values_list('author_id', flat=True))
+
+    @admin.action(description='Удалить выбранные заметки')
+    def mark_deleted(self, request, queryset):
+        count = sum(
+            purge.soft_delete(queryset.filter(author_id=author_id), author_id)
+            for author_id in self._authors(queryset)
+        )
+        if count:
+            tasks.enqueue_once('purge')
+        self.message_user(request, f'Удалено заметок: {count}.')
+
+    @admin.action(description='Восстановить выбранные заметки')
+    def restore(self, request, queryset):
+        authors = self._authors(queryset.filter(deleted=True))
+        count = queryset.filter(deleted=True).update(deleted=False)
+        for author_id in authors:
+            cache.invalidate(author_id)
+        self.message_user(request, f'Восстановлено заметок: {count}.')
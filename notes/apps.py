@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        # Сигналы сброса кеша пользователя и удаления его заметок.
+        from . import auth, purge  # noqa: F401
@@ -0,0 +1,196 @@
+"""Асинхронные версии представлений заметок для запуска под ASGI.
+
+Пользователь проверяется через ``request.auser()`` вместо
+``LoginRequiredMixin``, заметки читаются и пишутся асинхронным ORM.
+Подключаются вместо ``notes.views`` настройкой ``NOTES_ASYNC_VIEWS``.
+Список и заметка используют тот же кеш и те же реплики базы, что и
+синхронные представления; условные GET-запросы (ETag) поддерживают только
+синхронные.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import reverse_lazy
+from django.views import generic
+
+from yanote import replicas
+
+from . import cache, throttling, views
+from .forms import WARNING, NoteForm
+from .models import Note
+
+
+@sync_to_async
+def _save_form(form):
+    # Точка сохранения: конфликт slug не должен ломать внешнюю транзакцию.
+    with transaction.atomic():
+        form.save()
+
+
+class NoteBase(generic.View):
+    """Базовый класс асинхронных представлений заметок."""
+    model = Note
+    success_url = reverse_lazy('notes:success')
+    template_name = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Асинхронная замена LoginRequiredMixin."""
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(
+                request.get_full_path(), settings.LOGIN_URL
+            )
+        # Шаблоны и контекст-процессоры не должны загружать пользователя
+        # синхронно.
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """Пользователь может работать только со своими заметками."""
+        return self.model.objects.filter(author=self.request.user)
+
+    async def get_object(self):
+        try:
+            return await self.get_queryset().aget(slug=self.kwargs['slug'])
+        except self.model.DoesNotExist:
+            raise Http404('Заметка не найдена.')
+
+    def render(self, context):
+        return TemplateResponse(self.request, self.template_name, context)
+
+
+class NotesList(NoteBase):
+    """Список всех заметок пользователя."""
+    template_name = 'notes/list.html'
+    page_size = views.NotesList.page_size
+    cursor_kwarg = views.NotesList.cursor_kwarg
+
+    async def get(self, request, *args, **kwargs):
+        cursor = request.GET.get(self.cursor_kwarg) or 0
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            raise Http404('Неверный курсор страницы.')
+        key = await cache.amake_key('list', request.user.id, cursor)
+        with replicas.read_from_replica(request):
+            notes, next_cursor = await cache.aget_or_set(
+                key, lambda: self.get_page(cursor)
+            )
+        return self.render({
+            'object_list': notes,
+            'next_cursor': next_cursor,
+            'cursor_kwarg': self.cursor_kwarg,
+            'cache_key': key,
+            'cache_timeout': cache.get_timeout(),
+        })
+
+    async def get_page(self, cursor):
+        queryset = self.get_queryset().filter(id__gt=cursor).order_by(
+            'id'
+        ).only('id', 'slug', 'title')[:self.page_size + 1]
+        notes = [note async for note in queryset.aiterator()]
+        next_cursor = None
+        if len(notes) > self.page_size:
+            notes = notes[:self.page_size]
+            next_cursor = notes[-1].id
+        return notes, next_cursor
+
+
+class NoteDetail(NoteBase):
+    """Заметка подробно."""
+    template_name = 'notes/detail.html'
+
+    async def get(self, request, *args, **kwargs):
+        key = await cache.amake_key(
+            'detail', request.user.id, kwargs['slug']
+        )
+        with replicas.read_from_replica(request):
+            note = await cache.aget_or_set(key, self.get_object)
+        return self.render({
+            'note': note,
+            'object': note,
+            'cache_key': key,
+            'cache_timeout': cache.get_timeout(),
+        })
+
+
+class WriteThrottleMixin:
+    """Асинхронная версия views.WriteThrottleMixin."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if request.method != 'POST' or not user.is_authenticated:
+            return await super().dispatch(request, *args, **kwargs)
+        return await throttling.aprotect(
+            request, user.id,
+            lambda: super(WriteThrottleMixin, self).dispatch(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class NoteFormMixin(NoteBase):
+    """Сохранение заметки из формы."""
+    template_name = 'notes/form.html'
+
+    def render_form(self, form, note=None):
+        return self.render({'form': form, 'note': note, 'object': note})
+
+    async def save_form(self, form, note=None):
+        try:
+            await _save_form(form)
+        except IntegrityError:
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.render_form(form, note)
+        return HttpResponseRedirect(self.success_url)
+
+
+class NoteCreate(WriteThrottleMixin, NoteFormMixin):
+    """Добавление заметки."""
+
+    async def get(self, request, *args, **kwargs):
+        return self.render_form(NoteForm())
+
+    async def post(self, request, *args, **kwargs):
+        form = NoteForm(request.POST)
+        if not form.is_valid():
+            return self.render_form(form)
+        form.instance.author = request.user
+        return await self.save_form(form)
+
+
+class NoteUpdate(WriteThrottleMixin, NoteFormMixin):
+    """Редактирование заметки."""
+
+    async def get(self, request, *args, **kwargs):
+        note = await self.get_object()
+        return self.render_form(NoteForm(instance=note), note)
+
+    async def post(self, request, *args, **kwargs):
+        note = await self.get_object()
+        form = NoteForm(request.POST, instance=note)
+        if not form.is_valid():
+            return self.render_form(form, note)
+        return await self.save_form(form, note)
+
+
+class NoteDelete(WriteThrottleMixin, NoteBase):
+    """Удаление заметки."""
+    template_name = 'notes/delete.html'
+
+    def get_queryset(self):
+        return super().get_queryset().metadata()
+
+    async def get(self, request, *args, **kwargs):
+        note = await self.get_object()
+        return self.render({'note': note, 'object': note})
+
+    async def post(self, request, *args, **kwargs):
+        note = await self.get_object()
+        await sync_to_async(views.soft_delete_notes)(
+            self.get_queryset().filter(pk=note.pk), request.user.id
+        )
+        return HttpResponseRedirect(self.success_url)
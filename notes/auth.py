@@ -0,0 +1,70 @@
+"""Пользователь запроса из кеша.
+
+``CachedModelBackend`` загружает пользователя сессии из кеша, а в БД
+обращается, только если его там нет. В кеш попадают лишь поля, которые
+нужны на каждом запросе (``USER_FIELDS``), остальные загружаются при
+обращении. Запись сбрасывается при выходе, сохранении пользователя
+(в том числе смене пароля) и его удалении.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+USER_KEY = 'auth:user:{user_id}'
+# Пароль нужен для проверки хеша сессии (get_session_auth_hash).
+USER_FIELDS = (
+    'id', 'username', 'password', 'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def get_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+
+
+def _key(user_id):
+    return USER_KEY.format(user_id=user_id)
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кеша."""
+
+    def get_user(self, user_id):
+        key = _key(user_id)
+        user = cache.get(key)
+        if user is None:
+            User = get_user_model()
+            try:
+                user = User._default_manager.only(*USER_FIELDS).get(
+                    pk=user_id
+                )
+            except User.DoesNotExist:
+                return None
+            cache.set(key, user, get_timeout())
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(user_logged_in)
+def cache_logged_in_user(sender, request, user, **kwargs):
+    # Первый запрос после входа уже не обращается к БД за пользователем.
+    if isinstance(user, get_user_model()):
+        cache.set(_key(user.pk), user, get_timeout())
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate(user.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_changed_user(sender, instance, **kwargs):
+    invalidate(instance.pk)
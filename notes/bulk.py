@@ -0,0 +1,162 @@
+"""Пакетное создание, изменение и удаление заметок для JSON API.
+
+Каждый элемент пакета проверяется формой ``NoteForm``, после чего все
+корректные элементы применяются в одной транзакции через ``bulk_create``,
+``bulk_update`` и один ``DELETE``. Для каждого элемента возвращается
+отдельный результат.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, search, slugs
+from .forms import WARNING, NoteForm
+from .models import Note
+
+NOT_FOUND = 'Заметка не найдена.'
+UPDATE_FIELDS = ('title', 'text', 'updated_at')
+
+
+class BatchError(ValueError):
+    """Пакет не соответствует формату API."""
+
+
+def get_max_items():
+    return getattr(settings, 'NOTES_API_BATCH_SIZE', 1000)
+
+
+def _error(errors):
+    return {'status': 'error', 'errors': errors}
+
+
+def _parse(payload):
+    if not isinstance(payload, dict):
+        raise BatchError('Ожидается объект с ключами create, update, delete.')
+    sections = []
+    for name in ('create', 'update', 'delete'):
+        items = payload.get(name, [])
+        if not isinstance(items, list):
+            raise BatchError(f'{name}: ожидается список.')
+        sections.append(items)
+    if sum(map(len, sections)) > get_max_items():
+        raise BatchError(
+            f'В пакете может быть не больше {get_max_items()} элементов.'
+        )
+    return sections
+
+
+def _validate_creates(author, items):
+    """Проверяет новые заметки и подбирает им slug."""
+    max_length = Note._meta.get_field('slug').max_length
+    results = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        form = NoteForm(data=item if isinstance(item, dict) else {})
+        if not form.is_valid():
+            results[index] = _error(form.errors)
+            continue
+        note = form.save(commit=False)
+        note.author = author
+        valid[index] = note
+    untitled = [index for index, note in valid.items() if not note.slug]
+    bases = dict(zip(untitled, (
+        slug[:max_length] for slug in slugs.slugify_many(
+            valid[index].title for index in untitled
+        )
+    )))
+    # slug уникален среди заметок всех авторов.
+    taken = slugs.fetch_taken(
+        Note.all_objects.all(),
+        {note.slug for note in valid.values() if note.slug}
+        | set(bases.values()),
+    )
+    for index, note in list(valid.items()):
+        if not note.slug:
+            continue
+        if note.slug in taken:
+            results[index] = _error({'slug': [note.slug + WARNING]})
+            del valid[index]
+        else:
+            taken.add(note.slug)
+    for index, base in bases.items():
+        valid[index].slug = slugs.allocate(base, taken, max_length)
+    return results, valid
+
+
+def _validate_updates(items, queryset):
+    """Проверяет изменения существующих заметок автора."""
+    results = [None] * len(items)
+    valid = {}
+    existing = queryset.in_bulk(
+        [item['slug'] for item in items
+         if isinstance(item, dict) and isinstance(item.get('slug'), str)],
+        field_name='slug',
+    )
+    now = timezone.now()
+    for index, item in enumerate(items):
+        slug = item.get('slug') if isinstance(item, dict) else None
+        note = existing.get(slug) if isinstance(slug, str) else None
+        if note is None:
+            results[index] = _error({'slug': [NOT_FOUND]})
+            continue
+        form = NoteForm(
+            data={
+                'title': item.get('title', note.title),
+                'text': item.get('text', note.text),
+                'slug': note.slug,
+            },
+            instance=note,
+        )
+        if not form.is_valid():
+            results[index] = _error(form.errors)
+            continue
+        note = form.save(commit=False)
+        note.updated_at = now
+        valid[index] = note
+    return results, valid
+
+
+def apply_batch(author, payload):
+    """Применяет пакет изменений к заметкам автора.
+
+    Возвращает словарь с результатами для каждого элемента пакета.
+    """
+    creates, updates, deletes = _parse(payload)
+    queryset = Note.objects.filter(author=author)
+    create_results, new_notes = _validate_creates(author, creates)
+    update_results, changed_notes = _validate_updates(updates, queryset)
+    delete_slugs = {slug for slug in deletes if isinstance(slug, str)}
+    existing_slugs = dict(
+        queryset.filter(slug__in=delete_slugs).values_list('slug', 'id')
+    )
+    batch_size = get_max_items()
+    with transaction.atomic():
+        Note.objects.bulk_create(new_notes.values(), batch_size=batch_size)
+        Note.objects.bulk_update(
+            changed_notes.values(), UPDATE_FIELDS, batch_size=batch_size
+        )
+        if existing_slugs:
+            deleted_ids = existing_slugs.values()
+            queryset.filter(id__in=deleted_ids).delete()
+            search.unindex_notes(deleted_ids)
+        search.index_notes([*new_notes.values(), *changed_notes.values()])
+        cache.invalidate(author.id)
+    for index, note in new_notes.items():
+        create_results[index] = {
+            'status': 'created', 'id': note.id, 'slug': note.slug
+        }
+    for index, note in changed_notes.items():
+        update_results[index] = {
+            'status': 'updated', 'id': note.id, 'slug': note.slug
+        }
+    delete_results = [
+        {'status': 'deleted', 'slug': slug}
+        if isinstance(slug, str) and slug in existing_slugs
+        else _error({'slug': [NOT_FOUND]})
+        for slug in deletes
+    ]
+    return {
+        'create': create_results,
+        'update': update_results,
+        'delete': delete_results,
+    }
@@ -0,0 +1,82 @@
+"""Кеш заметок пользователя.
+
+Все ключи содержат версию заметок автора. Любое изменение заметки
+записывает новую версию, и прежние записи кеша больше не читаются, а
+вытесняются самим бэкендом по таймауту. Версия случайная, а не счётчик:
+если её вытеснят из кеша, новая не совпадёт ни с одной из старых.
+"""
+from functools import partial
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from yanote import replicas
+
+VERSION_KEY = 'notes:version:{author_id}'
+
+
+def get_timeout():
+    return getattr(settings, 'NOTES_CACHE_TIMEOUT', 300)
+
+
+def get_version(author_id):
+    """Текущая версия заметок автора."""
+    return cache.get_or_set(
+        VERSION_KEY.format(author_id=author_id), lambda: uuid4().hex, None
+    )
+
+
+async def aget_version(author_id):
+    return await cache.aget_or_set(
+        VERSION_KEY.format(author_id=author_id), lambda: uuid4().hex, None
+    )
+
+
+def _join(kind, author_id, version, parts):
+    return ':'.join(map(str, ('notes', kind, author_id, version, *parts)))
+
+
+def make_key(kind, author_id, *parts):
+    """Ключ кеша для данных вида ``kind`` текущей версии заметок автора."""
+    return _join(kind, author_id, get_version(author_id), parts)
+
+
+async def amake_key(kind, author_id, *parts):
+    return _join(kind, author_id, await aget_version(author_id), parts)
+
+
+def _bump_version(author_id):
+    cache.set(VERSION_KEY.format(author_id=author_id), uuid4().hex, None)
+
+
+def _changed(author_id):
+    _bump_version(author_id)
+    # Пока реплики могут отставать, чтения автора идут в основную базу и
+    # в кеш не попадают устаревшие данные.
+    replicas.mark_written(author_id)
+
+
+def invalidate(author_id, using=None):
+    """Сбрасывает кеш заметок автора.
+
+    Версия меняется сразу и ещё раз после коммита, чтобы параллельный
+    запрос не успел закешировать данные незавершённой транзакции.
+    """
+    _changed(author_id)
+    transaction.on_commit(partial(_changed, author_id), using=using)
+
+
+def get_or_set(key, default):
+    """Значение из кеша или результат ``default()``, сохранённый в кеш."""
+    return cache.get_or_set(key, default, get_timeout())
+
+
+async def aget_or_set(key, default):
+    """Асинхронный ``get_or_set`` для корутины ``default()``."""
+    value = await cache.aget(key)
+    if value is None:
+        value = await default()
+        await cache.aset(key, value, get_timeout())
+    return value
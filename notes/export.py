@@ -0,0 +1,106 @@
+"""Потоковая выгрузка заметок.
+
+Заметки читаются из БД порциями через ``.iterator(chunk_size=...)`` и
+сразу превращаются в байты выбранного формата, поэтому память не растёт
+с числом заметок. Поддерживаются NDJSON, CSV и ZIP-архив Markdown-файлов,
+названных по slug заметки.
+"""
+import csv
+import json
+import zipfile
+from collections import namedtuple
+
+from django.utils import timezone
+
+from .fields import decompress
+
+FIELDS = ('slug', 'title', 'text', 'updated_at')
+CHUNK_SIZE = 500
+
+Format = namedtuple('Format', ('content_type', 'extension', 'render'))
+
+
+class _Pipe:
+    """Файлоподобный буфер: копит записанное до следующего ``take()``."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class _Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Кортежи полей FIELDS заметок queryset в порядке id."""
+    rows = queryset.order_by('id').values_list(*FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    # values_list() обходит атрибут модели: сжатый текст распаковываем сами.
+    for slug, title, text, updated_at in rows:
+        yield slug, title, decompress(text), updated_at
+
+
+def render_ndjson(rows):
+    for slug, title, text, updated_at in rows:
+        line = json.dumps(
+            {
+                'slug': slug,
+                'title': title,
+                'text': text,
+                'updated_at': updated_at.isoformat(),
+            },
+            ensure_ascii=False,
+        )
+        yield f'{line}\n'.encode()
+
+
+def render_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS).encode()
+    for slug, title, text, updated_at in rows:
+        yield writer.writerow(
+            (slug, title, text, updated_at.isoformat())
+        ).encode()
+
+
+def render_markdown_zip(rows):
+    pipe = _Pipe()
+    # Поток без seek: zipfile пишет размеры файлов в дескрипторы данных.
+    with zipfile.ZipFile(pipe, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for slug, title, text, updated_at in rows:
+            info = zipfile.ZipInfo(
+                f'{slug}.md',
+                date_time=timezone.localtime(updated_at).timetuple()[:6],
+            )
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, f'# {title}\n\n{text}\n')
+            yield pipe.take()
+    yield pipe.take()
+
+
+FORMATS = {
+    'ndjson': Format('application/x-ndjson', 'ndjson', render_ndjson),
+    'csv': Format('text/csv', 'csv', render_csv),
+    'zip': Format('application/zip', 'zip', render_markdown_zip),
+}
+
+
+def export_notes(queryset, fmt, chunk_size=CHUNK_SIZE):
+    """Генератор байтов выгрузки заметок queryset в формате ``fmt``."""
+    return FORMATS[fmt].render(iter_rows(queryset, chunk_size))
@@ -0,0 +1,139 @@
+"""Текстовое поле со сжатием больших значений.
+
+Тексты длиннее ``NOTES_COMPRESS_THRESHOLD`` байт (UTF-8) хранятся в
+SQLite как BLOB, сжатый zlib; короткие остаются обычным текстом. Колонка
+при этом не меняется: SQLite хранит в TEXT-колонке и строки, и BLOB.
+Прочитанное из БД значение распаковывается только при первом обращении
+к атрибуту модели, поэтому списки и проверки, которые текст не выводят,
+его не распаковывают.
+
+На остальных СУБД значения хранятся без сжатия: PostgreSQL сам сжимает
+большие значения (TOAST), а полнотекстовому индексу нужен текст.
+
+Уже сохранённые тексты сжимает ``compress_existing`` (команда
+``compress_notes``); миграция 0005 делает то же своей копией кода.
+"""
+import zlib
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models.query_utils import DeferredAttribute
+
+COMPRESSED_VENDORS = ('sqlite',)
+COMPRESS_LEVEL = 6
+
+
+def get_threshold():
+    return getattr(settings, 'NOTES_COMPRESS_THRESHOLD', 1024)
+
+
+class CompressedText(bytes):
+    """Сжатый текст, прочитанный из БД и ещё не распакованный."""
+
+    def decompress(self):
+        return zlib.decompress(self).decode()
+
+
+def compress(value):
+    """Сжатые байты текста ``value``."""
+    return CompressedText(zlib.compress(value.encode(), COMPRESS_LEVEL))
+
+
+def decompress(value):
+    """Текст значения поля: распаковывает CompressedText."""
+    if isinstance(value, CompressedText):
+        return value.decompress()
+    return value
+
+
+def should_compress(value):
+    return len(value.encode()) > get_threshold()
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Распаковывает значение при первом чтении атрибута."""
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedText):
+            value = instance.__dict__[self.field.attname] = value.decompress()
+        return value
+
+    def __set__(self, instance, value):
+        # Дескриптор данных: иначе значение из __dict__ экземпляра
+        # читается в обход __get__.
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    descriptor_class = CompressedTextDescriptor
+
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, bytes):
+            return CompressedText(value)
+        return value
+
+    def to_python(self, value):
+        return super().to_python(decompress(value))
+
+    def pre_save(self, model_instance, add):
+        # Нераспакованное значение сохраняется как есть, без повторного
+        # сжатия.
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, CompressedText):
+            return value
+        return super().pre_save(model_instance, add)
+
+    def get_db_prep_save(self, value, connection):
+        if connection.vendor not in COMPRESSED_VENDORS:
+            return super().get_db_prep_save(decompress(value), connection)
+        if isinstance(value, CompressedText):
+            return bytes(value)
+        value = super().get_db_prep_save(value, connection)
+        if isinstance(value, str) and should_compress(value):
+            return bytes(compress(value))
+        return value
+
+
+def compress_existing(model, field_name, using='default', batch_size=1000):
+    """Сжимает сохранённые без сжатия значения поля порциями по id.
+
+    Возвращает число сжатых значений, их объём до и после сжатия в байтах.
+    """
+    if connections[using].vendor not in COMPRESSED_VENDORS:
+        return 0, 0, 0
+    field = model._meta.get_field(field_name)
+    queryset = model._default_manager.using(using).only(
+        'id', field_name
+    ).order_by('id')
+    count = raw_size = stored_size = 0
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        changed = []
+        for obj in batch:
+            value = obj.__dict__[field.attname]
+            if isinstance(value, str) and should_compress(value):
+                raw_size += len(value.encode())
+                stored_size += len(compress(value))
+                changed.append(obj)
+        if changed:
+            with transaction.atomic(using=using):
+                model._default_manager.using(using).bulk_update(
+                    changed, (field_name,)
+                )
+            count += len(changed)
+    return count, raw_size, stored_size
+
+
+def format_report(count, raw_size, stored_size):
+    """Строка отчёта о сэкономленном месте."""
+    saved = raw_size - stored_size
+    percent = saved / raw_size * 100 if raw_size else 0
+    return (
+        f'Сжато текстов: {count}, {raw_size} -> {stored_size} байт, '
+        f'сэкономлено {saved} байт ({percent:.1f}%).'
+    )
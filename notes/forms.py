@@ -1,7 +1,4 @@
-from pytils.translit import slugify
-
 from django import forms
-from django.core.exceptions import ValidationError
 
 from .models import Note
 
@@ -15,15 +12,15 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def validate_unique(self):
+        """Уникальность slug не проверяется отдельным запросом.
+
+        Её гарантирует ограничение в БД: пустой slug модель подберёт сама,
+        а конфликт явно указанного slug представление превращает в ошибку
+        формы (см. ``NoteFormMixin``).
+        """
+        exclude = self._get_validation_exclusions() | {'slug'}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except forms.ValidationError as error:
+            self._update_errors(error)
@@ -0,0 +1,71 @@
+"""Пакетная загрузка заметок из NDJSON и CSV.
+
+Строки читаются потоком и вставляются порциями через ``bulk_create``,
+каждая порция в своей транзакции. Свободные slug подбираются в памяти по
+множеству занятых slug, которое загружается из БД один раз.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+
+from . import cache, search, slugs
+from .models import Note
+
+FORMATS = ('ndjson', 'csv')
+BATCH_SIZE = 1000
+
+
+def read_rows(lines, fmt):
+    """Словари заметок из итератора строк файла формата ``fmt``."""
+    if fmt == 'csv':
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _build_notes(rows, author, taken):
+    """Заметки из порции строк; slug порции считаются одним вызовом."""
+    title_length = Note._meta.get_field('title').max_length
+    slug_length = Note._meta.get_field('slug').max_length
+    notes, sources = [], []
+    for row in rows:
+        title = str(row.get('title') or '').strip()[:title_length]
+        text = str(row.get('text') or '')
+        if not title and not text:
+            continue
+        note = Note(author=author, text=text)
+        if title:
+            note.title = title
+        notes.append(note)
+        sources.append(row.get('slug') or note.title)
+    bases = slugs.slugify_many(sources)
+    for note, base in zip(notes, bases):
+        note.slug = slugs.allocate(base[:slug_length], taken, slug_length)
+    return notes
+
+
+def import_rows(author, rows, batch_size=BATCH_SIZE, on_batch=None):
+    """Загружает заметки автора из итератора словарей ``rows``.
+
+    После каждой закоммиченной порции вызывается ``on_batch(done, created)``
+    с числом обработанных строк и созданных заметок. Возвращает итоговые
+    значения этих счётчиков.
+    """
+    taken = set(Note.all_objects.values_list('slug', flat=True).iterator())
+    rows = iter(rows)
+    done = created = 0
+    while batch := list(islice(rows, batch_size)):
+        notes = _build_notes(batch, author, taken)
+        with transaction.atomic():
+            Note.objects.bulk_create(notes, batch_size=batch_size)
+            search.index_notes(notes)
+        done += len(batch)
+        created += len(notes)
+        if on_batch is not None:
+            on_batch(done, created)
+    cache.invalidate(author.id)
+    return done, created
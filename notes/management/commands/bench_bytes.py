@@ -0,0 +1,135 @@
+import random
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.test import Client
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+
+from notes.models import Note
+
+WORDS = (
+    'ERROR', 'WARNING', 'INFO', 'DEBUG', 'соединение', 'запрос', 'ответ',
+    'таймаут', 'повтор', 'сервер', 'клиент', 'ошибка', 'готово',
+)
+
+
+def _value_size(value):
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (bytes, memoryview)):
+        return len(value)
+    return 8 if value is not None else 0
+
+
+class CountingCursor(CursorWrapper):
+    """Курсор, считающий байты значений прочитанных строк."""
+
+    def _count(self, rows):
+        self.db.bytes_read += sum(
+            _value_size(value) for row in rows for value in row
+        )
+        return rows
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self._count((row,))
+        return row
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._count(self.cursor.fetchmany())
+        return self._count(self.cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._count(self.cursor.fetchall())
+
+
+@contextmanager
+def count_bytes_read():
+    """Считает в ``connection.bytes_read`` байты, прочитанные из БД."""
+    connection.bytes_read = 0
+    connection.make_cursor = lambda cursor: CountingCursor(cursor, connection)
+    try:
+        yield connection
+    finally:
+        del connection.make_cursor
+
+
+def _log_text(size):
+    """Текст лога размером около ``size`` байт со случайными числами."""
+    lines = []
+    length = 0
+    while length < size:
+        line = ' '.join(
+            [random.choice(WORDS), str(random.getrandbits(64))]
+            + random.choices(WORDS, k=6)
+        )
+        lines.append(line)
+        length += len(line.encode()) + 1
+    return '\n'.join(lines)
+
+
+class Command(BaseCommand):
+    help = (
+        'Число байт, прочитанных из БД за один запрос к маршрутам '
+        'заметок, на заметках с большим текстом (временная тестовая БД).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--notes', type=int, default=50,
+            help='Число заметок пользователя.',
+        )
+        parser.add_argument(
+            '--text-size', type=int, default=100_000,
+            help='Размер текста заметки в байтах.',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        random.seed(0)
+        author = get_user_model().objects.create(username='bench')
+        Note.objects.bulk_create(
+            Note(
+                title=f'Лог {index}',
+                text=_log_text(options['text_size']),
+                slug=f'log-{index}',
+                author=author,
+            )
+            for index in range(options['notes'])
+        )
+        client = Client()
+        client.force_login(author)
+        slug = Note.objects.order_by('id').values_list(
+            'slug', flat=True
+        )[0]
+        routes = (
+            ('notes:list', (), {}),
+            ('notes:detail', (slug,), {}),
+            ('notes:edit', (slug,), {}),
+            ('notes:delete', (slug,), {}),
+            ('notes:search', (), {'q': 'лог'}),
+        )
+        self.stdout.write(f'{"маршрут":16} {"байт из БД":>12}')
+        for name, args, params in routes:
+            cache.clear()
+            with count_bytes_read():
+                client.get(reverse(name, args=args), params)
+            self.stdout.write(f'{name:16} {connection.bytes_read:12}')
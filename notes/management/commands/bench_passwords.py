@@ -0,0 +1,65 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+from yanote.hashers import PROFILES, SCRYPT
+
+PASSWORD = 'correct-horse-battery'
+WORK_FACTORS = tuple(2**power for power in range(12, 18))
+
+
+class Command(BaseCommand):
+    help = (
+        'Скорость проверки пароля при входе: входов в секунду на одно ядро '
+        'для основного хешера каждого профиля yanote.hashers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seconds', type=float, default=1,
+            help='Длительность замера для каждого хешера.',
+        )
+        parser.add_argument(
+            '--tune', action='store_true',
+            help='Замерить scrypt с разными PASSWORD_SCRYPT_WORK_FACTOR.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"профиль":12} {"хешер":28} {"мс/вход":>9} '
+            f'{"входов/с/ядро":>14}'
+        )
+        for name, hashers in PROFILES.items():
+            hasher = import_string(hashers[0])()
+            self.report(name, hasher, options['seconds'])
+        if options['tune']:
+            hasher = import_string(SCRYPT)()
+            for work_factor in WORK_FACTORS:
+                with override_settings(
+                    PASSWORD_SCRYPT_WORK_FACTOR=work_factor
+                ):
+                    self.report(
+                        f'n=2**{work_factor.bit_length() - 1}', hasher,
+                        options['seconds'],
+                    )
+
+    def report(self, name, hasher, seconds):
+        elapsed, logins = self.measure(hasher, seconds)
+        self.stdout.write(
+            f'{name:12} {type(hasher).__name__:28} '
+            f'{elapsed / logins * 1000:9.2f} {logins / elapsed:14.1f}'
+        )
+
+    def measure(self, hasher, seconds):
+        """Проверяет пароль в одном потоке, пока не истечёт ``seconds``."""
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        started = perf_counter()
+        logins = 0
+        while True:
+            hasher.verify(PASSWORD, encoded)
+            logins += 1
+            elapsed = perf_counter() - started
+            if elapsed >= seconds:
+                return elapsed, logins
@@ -0,0 +1,353 @@
+import json
+import statistics
+from itertools import count
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+
+from notes import search, tasks
+from notes.models import Note
+
+PASSWORD = 'bench-password'
+# Запросы бенчмарка не должны упираться в лимит частоты изменений
+# (notes.throttling); сама проверка лимита по-прежнему выполняется.
+THROTTLE_BURST = 10**9
+
+
+class Route:
+    """Маршрут бенчмарка: ``request(client, note, index)`` и его замеры.
+
+    ``prepare(client, note, index)``, если задан, выполняется до замера и
+    возвращает клиента и объект для ``request``: подготовка данных не
+    попадает ни во время, ни в число запросов маршрута.
+    """
+
+    def __init__(self, name, request, prepare=None):
+        self.name = name
+        self.request = request
+        self.prepare = prepare
+        self.latencies = []
+        self.queries = []
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(
+                latencies, n=100, method='inclusive'
+            )
+        else:
+            # Для одного замера все перцентили равны ему.
+            percentiles = latencies * 99
+        return {
+            'requests': len(latencies),
+            'p50_ms': percentiles[49] * 1000,
+            'p95_ms': percentiles[94] * 1000,
+            'p99_ms': percentiles[98] * 1000,
+            'rps': len(latencies) / sum(latencies),
+            # Медиана: первые запросы каждого клиента идут в холодный кеш.
+            'queries': statistics.median_low(self.queries),
+        }
+
+
+def _note_form(index):
+    return {'title': f'Заметка {index}', 'text': 'Текст заметки'}
+
+
+def _post_edit(client, note, index):
+    return client.post(
+        reverse('notes:edit', args=(note.slug,)),
+        {**_note_form(index), 'slug': note.slug},
+    )
+
+
+def _post_delete(client, victim, index):
+    return client.post(reverse('notes:delete', args=(victim.slug,)))
+
+
+def _post_bulk_delete(client, victim, index):
+    return client.post(reverse('notes:bulk_delete'), {'ids': victim.id})
+
+
+def _get_list_cold(client, note, index):
+    cache.clear()
+    return client.get(reverse('notes:list'))
+
+
+def _post_login(client, note, index):
+    return Client().post(reverse('users:login'), {
+        'username': note.author.username, 'password': PASSWORD,
+    })
+
+
+def _new_session(client, note, index):
+    session = Client()
+    session.force_login(note.author)
+    return session, note
+
+
+def _post_logout(client, note, index):
+    return client.post(reverse('users:logout'))
+
+
+def _post_bulk(client, note, index):
+    return client.post(
+        reverse('notes:api_bulk'),
+        json.dumps({'update': [{'slug': note.slug, 'text': 'Текст'}]}),
+        content_type='application/json',
+    )
+
+
+def _post_task(client, note, index):
+    return client.post(
+        reverse('notes:api_tasks'), {'kind': 'export', 'format': 'csv'}
+    )
+
+
+def _get(name, *, slug=False, **params):
+    def request(client, note, index):
+        args = (note.slug,) if slug else ()
+        return client.get(reverse(name, args=args), params)
+    return request
+
+
+def _get_by_id(name):
+    def request(client, obj, index):
+        return client.get(reverse(name, args=(obj.id,)))
+    return request
+
+
+def _get_export(fmt):
+    def request(client, note, index):
+        return client.get(reverse('notes:export', args=(fmt,)))
+    return request
+
+
+def _routes():
+    """Маршруты notes/urls.py и пользователей из yanote/urls.py."""
+    created = count()
+
+    def post_add(client, note, index):
+        return client.post(reverse('notes:add'), _note_form(next(created)))
+
+    deleted = count()
+
+    def create_victim(client, note, index):
+        # Slug удалённой заметки занят до purge: одинаковые заголовки
+        # замеряли бы подбор суффикса, а не удаление.
+        victim = Note.objects.create(
+            title=f'Удаляемая {next(deleted)}', text='Текст',
+            author=note.author,
+        )
+        return client, victim
+
+    signed_up = count()
+
+    def post_signup(client, note, index):
+        return Client().post(reverse('users:signup'), {
+            'username': f'bench-new-{next(signed_up)}',
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        })
+
+    exports = {}
+
+    def finished_export(client, note, index):
+        # Одна готовая выгрузка на автора, выполненная до замеров.
+        if note.author_id not in exports:
+            note_task = tasks.enqueue('export', note.author, format='csv')
+            exports[note.author_id] = tasks.run(note_task.id)
+        return client, exports[note.author_id]
+
+    return [
+        Route('notes:home', _get('notes:home')),
+        Route('notes:list', _get('notes:list')),
+        Route('notes:list (cold cache)', _get_list_cold),
+        Route('notes:detail', _get('notes:detail', slug=True)),
+        Route('notes:add GET', _get('notes:add')),
+        Route('notes:add POST', post_add),
+        Route('notes:edit GET', _get('notes:edit', slug=True)),
+        Route('notes:edit POST', _post_edit),
+        Route('notes:delete GET', _get('notes:delete', slug=True)),
+        Route('notes:delete POST', _post_delete, create_victim),
+        Route('notes:bulk_delete', _post_bulk_delete, create_victim),
+        Route('notes:success', _get('notes:success')),
+        Route('notes:search', _get('notes:search', q='заметка')),
+        Route('notes:api_search', _get('notes:api_search', q='заметка')),
+        Route('notes:export ndjson', _get_export('ndjson')),
+        Route('notes:export csv', _get_export('csv')),
+        Route('notes:export zip', _get_export('zip')),
+        Route('notes:api_bulk', _post_bulk),
+        Route('notes:api_tasks', _post_task),
+        Route(
+            'notes:api_task', _get_by_id('notes:api_task'), finished_export
+        ),
+        Route(
+            'notes:task_download', _get_by_id('notes:task_download'),
+            finished_export,
+        ),
+        Route('users:login GET', _get('users:login')),
+        Route('users:login POST', _post_login),
+        Route('users:logout', _post_logout, _new_session),
+        Route('users:signup GET', _get('users:signup')),
+        Route('users:signup POST', post_signup),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный бенчмарк маршрутов заметок во временной тестовой БД: '
+        'задержки (p50/p95/p99), пропускная способность и число '
+        'SQL-запросов. С --baseline завершается ошибкой при регрессии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=10, help='Число пользователей.'
+        )
+        parser.add_argument(
+            '--notes', type=int, default=1000,
+            help='Число заметок у каждого пользователя.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Число запросов к каждому маршруту.',
+        )
+        parser.add_argument(
+            '--baseline', type=Path,
+            help='JSON с эталонными p95 и числом запросов по маршрутам.',
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результаты в файл --baseline.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 относительно эталона (0.2 = 20%%).',
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('Для --save-baseline нужен --baseline.')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with TemporaryDirectory() as task_root, override_settings(
+                NOTES_THROTTLE_BURST=THROTTLE_BURST,
+                NOTES_TASK_ROOT=Path(task_root),
+            ):
+                results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self.print_results(results)
+        if options['save_baseline']:
+            options['baseline'].write_text(
+                json.dumps(results, indent=2, ensure_ascii=False)
+            )
+        elif options['baseline']:
+            self.check_baseline(results, options)
+
+    def seed(self, users, notes):
+        """Создаёт users пользователей по notes заметок через bulk_create."""
+        User = get_user_model()
+        password = make_password(PASSWORD)
+        authors = User.objects.bulk_create(
+            User(username=f'bench-{index}', password=password)
+            for index in range(users)
+        )
+        for author in authors:
+            created = Note.objects.bulk_create(
+                (
+                    Note(
+                        title=f'Заголовок {index}',
+                        text='Текст заметки',
+                        slug=f'{author.username}-note-{index}',
+                        author=author,
+                    )
+                    for index in range(notes)
+                ),
+                batch_size=1000,
+            )
+            search.index_notes(created)
+        return authors
+
+    def run(self, options):
+        started = perf_counter()
+        authors = self.seed(options['users'], options['notes'])
+        self.stdout.write(
+            f'Создано {len(authors)} x {options["notes"]} заметок '
+            f'за {perf_counter() - started:.1f} с.'
+        )
+        clients = []
+        for author in authors:
+            client = Client()
+            client.force_login(author)
+            clients.append((client, Note.objects.filter(author=author)[0]))
+        routes = _routes()
+        for route in routes:
+            for index in range(options['requests']):
+                client, note = clients[index % len(clients)]
+                if route.prepare:
+                    client, note = route.prepare(client, note, index)
+                with CaptureQueriesContext(connection) as queries:
+                    request_started = perf_counter()
+                    response = route.request(client, note, index)
+                    if response.streaming:
+                        # Потоковый ответ формируется при чтении.
+                        for _ in response.streaming_content:
+                            pass
+                    route.latencies.append(perf_counter() - request_started)
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f'{route.name}: ответ {response.status_code}.'
+                    )
+                route.queries.append(len(queries))
+        return {route.name: route.report() for route in routes}
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"маршрут":26} {"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} '
+            f'{"запр./с":>9} {"SQL":>5}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:26} {result["p50_ms"]:9.2f} {result["p95_ms"]:9.2f} '
+                f'{result["p99_ms"]:9.2f} {result["rps"]:9.0f} '
+                f'{result["queries"]:5}'
+            )
+
+    def check_baseline(self, results, options):
+        baseline = json.loads(options['baseline'].read_text())
+        failures = []
+        for name, expected in baseline.items():
+            result = results.get(name)
+            if result is None:
+                continue
+            if result['queries'] > expected['queries']:
+                failures.append(
+                    f'{name}: SQL-запросов {result["queries"]}, '
+                    f'эталон {expected["queries"]}'
+                )
+            limit = expected['p95_ms'] * (1 + options['tolerance'])
+            if result['p95_ms'] > limit:
+                failures.append(
+                    f'{name}: p95 {result["p95_ms"]:.2f} мс, '
+                    f'допустимо {limit:.2f} мс'
+                )
+        if failures:
+            raise CommandError(
+                'Регрессия производительности:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
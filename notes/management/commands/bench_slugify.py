@@ -0,0 +1,81 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from pytils.translit import slugify as pytils_slugify
+
+from notes import slugs
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'встреча', 'с', 'командой', 'в',
+    'понедельник', 'идеи', 'для', 'проекта', 'Ёлка', 'щётка', 'и',
+    'отчёт', '№5', '«Важно!»', 'съездить', 'на', 'дачу', '—', 'итоги',
+    'квартала', 'Python', 'Django', '2024', 'черновик', 'журнал',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает notes.slugs.slugify и slugify_many с '
+        'pytils.translit.slugify на корпусе русских заголовков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles', type=int, default=10000,
+            help='Размер корпуса заголовков.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз повторить замер, берётся лучший.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        titles = [
+            ' '.join(rng.choices(WORDS, k=rng.randint(2, 8)))
+            for _ in range(options['titles'])
+        ]
+        expected = [pytils_slugify(title) for title in titles]
+        if [slugs.slugify(title) for title in titles] != expected:
+            raise CommandError('slugs.slugify расходится с pytils.')
+        if slugs.slugify_many(titles) != expected:
+            raise CommandError('slugs.slugify_many расходится с pytils.')
+        # Прогретый кеш замеряется на заголовках, которые в нём помещаются:
+        # на большем корпусе замерялось бы вытеснение из LRU.
+        hot = titles[:slugs.slugify.cache_info().maxsize]
+
+        def cold():
+            slugs.slugify.cache_clear()
+            for title in titles:
+                slugs.slugify(title)
+
+        def warm():
+            for title in hot:
+                slugs.slugify(title)
+
+        cases = (
+            ('pytils.translit.slugify', titles, lambda: [
+                pytils_slugify(title) for title in titles
+            ]),
+            ('slugs.slugify (пустой кеш)', titles, cold),
+            ('slugs.slugify (прогретый кеш)', hot, warm),
+            ('slugs.slugify_many', titles, lambda: slugs.slugify_many(titles)),
+        )
+        baseline = None
+        for name, corpus, case in cases:
+            if case is warm:
+                slugs.slugify.cache_clear()
+                warm()
+            best = min(timeit.repeat(
+                case, number=1, repeat=options['repeat']
+            ))
+            speed = len(corpus) / best
+            baseline = baseline or speed
+            self.stdout.write(
+                f'{name:32} {speed:12,.0f} заголовков/с  '
+                f'x{speed / baseline:.1f}'
+            )
+            if case is warm:
+                self.stdout.write(f'{"":32} {slugs.slugify.cache_info()}')
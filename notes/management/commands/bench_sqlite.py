@@ -0,0 +1,115 @@
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from yanote import sqlite
+
+# Значения по умолчанию sqlite3 и бэкенда Django без OPTIONS.
+DEFAULT_PROFILE = {
+    'pragmas': {},
+    'begin': 'BEGIN',
+    'timeout': 5,
+}
+TUNED_PROFILE = {
+    'pragmas': sqlite.PRAGMAS,
+    'begin': 'BEGIN IMMEDIATE',
+    'timeout': sqlite.BUSY_TIMEOUT_SECONDS,
+}
+
+SCHEMA = (
+    'CREATE TABLE note (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'title TEXT, text TEXT)',
+    'CREATE INDEX note_author ON note (author_id, id)',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Конкурентная запись в SQLite: транзакций в секунду и ошибок '
+        '"database is locked" с настройками по умолчанию и с профилем '
+        'yanote.sqlite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Число потоков-писателей.',
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=3,
+            help='Длительность замера для каждого профиля.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"профиль":12} {"транз./с":>10} {"блокировок":>11}'
+        )
+        for name, profile in (
+            ('default', DEFAULT_PROFILE), ('tuned', TUNED_PROFILE)
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / 'bench.sqlite3'
+                commits, locked = self.run(path, profile, options)
+            self.stdout.write(
+                f'{name:12} {commits / options["seconds"]:10.0f} '
+                f'{locked:11}'
+            )
+
+    def connect(self, path, profile):
+        connection = sqlite3.connect(
+            path, timeout=profile['timeout'], isolation_level=None,
+            check_same_thread=False,
+        )
+        for pragma, value in profile['pragmas'].items():
+            connection.execute(f'PRAGMA {pragma}={value}')
+        return connection
+
+    def run(self, path, profile, options):
+        with self.connect(path, profile) as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        deadline = perf_counter() + options['seconds']
+        counters = []
+        lock = threading.Lock()
+
+        def writer(author_id):
+            connection = self.connect(path, profile)
+            commits = locked = 0
+            while perf_counter() < deadline:
+                try:
+                    # Как запрос Django: чтение и запись в одной транзакции.
+                    connection.execute(profile['begin'])
+                    connection.execute(
+                        'SELECT COUNT(*) FROM note WHERE author_id = ?',
+                        (author_id,),
+                    ).fetchone()
+                    connection.execute(
+                        'INSERT INTO note (author_id, title, text) '
+                        'VALUES (?, ?, ?)',
+                        (author_id, 'Заголовок', 'Текст заметки' * 20),
+                    )
+                    connection.execute('COMMIT')
+                    commits += 1
+                except sqlite3.OperationalError as error:
+                    if 'locked' not in str(error):
+                        raise
+                    locked += 1
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+            connection.close()
+            with lock:
+                counters.append((commits, locked))
+
+        threads = [
+            threading.Thread(target=writer, args=(index,))
+            for index in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return tuple(map(sum, zip(*counters)))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from notes import tasks
+from notes.fields import compress_existing, format_report, get_threshold
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        'Сжимает тексты заметок длиннее NOTES_COMPRESS_THRESHOLD байт, '
+        'сохранённые без сжатия, и выводит отчёт о сэкономленном месте.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число заметок в одной транзакции.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Псевдоним базы данных.',
+        )
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Поставить задачу в очередь run_note_worker.',
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            note_task = tasks.enqueue('compress')
+            self.stdout.write(f'Задача {note_task.id} поставлена в очередь.')
+            return
+        self.stdout.write(f'Порог сжатия: {get_threshold()} байт.')
+        report = compress_existing(
+            Note, 'text',
+            using=options['database'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(format_report(*report))
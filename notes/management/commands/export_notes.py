@@ -0,0 +1,50 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.export import CHUNK_SIZE, FORMATS, export_notes
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка всех заметок пользователя.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Автор заметок.')
+        parser.add_argument(
+            '--format', choices=tuple(FORMATS), default='ndjson',
+            help='Формат выгрузки.',
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для выгрузки, по умолчанию stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько заметок читать из БД за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get_by_natural_key(options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        chunks = export_notes(
+            Note.objects.filter(author=author),
+            options['format'],
+            chunk_size=options['chunk_size'],
+        )
+        if options['output'] == '-':
+            self._write(sys.stdout.buffer, chunks)
+        else:
+            with open(options['output'], 'wb') as output:
+                self._write(output, chunks)
+
+    def _write(self, output, chunks):
+        for chunk in chunks:
+            output.write(chunk)
+        output.flush()
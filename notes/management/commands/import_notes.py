@@ -0,0 +1,83 @@
+import os
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.imports import BATCH_SIZE, FORMATS, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Пакетная загрузка заметок пользователя из NDJSON или CSV. '
+        'После сбоя повторный запуск продолжает с последней сохранённой '
+        'порции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Автор заметок.')
+        parser.add_argument('path', type=Path, help='Файл с заметками.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла, по умолчанию по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько заметок вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--checkpoint', type=Path,
+            help='Файл контрольной точки, по умолчанию <path>.checkpoint.',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать сначала, не учитывая контрольную точку.',
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get_by_natural_key(options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        path = options['path']
+        fmt = options['format'] or path.suffix.lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise CommandError(f'Неизвестный формат файла: {fmt}.')
+        checkpoint = options['checkpoint'] or path.with_name(
+            f'{path.name}.checkpoint'
+        )
+        skip = 0
+        if checkpoint.exists() and not options['restart']:
+            skip = int(checkpoint.read_text())
+            self.stdout.write(f'Продолжаем после строки {skip}.')
+        started = time.perf_counter()
+
+        def on_batch(done, created):
+            self._save_checkpoint(checkpoint, skip + done)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{skip + done} строк, создано {created}, '
+                f'{done / elapsed:.0f} строк/с'
+            )
+
+        with path.open(encoding='utf-8', newline='') as lines:
+            rows = islice(read_rows(lines, fmt), skip, None)
+            done, created = import_rows(
+                author, rows, options['batch_size'], on_batch
+            )
+        checkpoint.unlink(missing_ok=True)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {done} строк, создано {created} заметок за '
+            f'{elapsed:.1f} с ({done / max(elapsed, 1e-9):.0f} строк/с).'
+        ))
+
+    def _save_checkpoint(self, checkpoint, done):
+        temporary = checkpoint.with_name(f'{checkpoint.name}.tmp')
+        temporary.write_text(str(done))
+        os.replace(temporary, checkpoint)
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from notes import tasks
+
+POOLS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Исполнитель фоновых задач заметок: забирает задачи из таблицы '
+        'NoteTask и выполняет их в пуле потоков или процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число одновременно выполняемых задач.',
+        )
+        parser.add_argument(
+            '--pool', choices=POOLS, default='thread',
+            help='Пул потоков или процессов.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, с.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['pool'] == 'process':
+            # Дочерние процессы не должны унаследовать соединения с БД.
+            connections.close_all()
+        self.stdout.write(
+            f'Исполнитель запущен: {options["workers"]} '
+            f'({options["pool"]}).'
+        )
+        with POOLS[options['pool']](max_workers=options['workers']) as pool:
+            try:
+                self.serve(pool, options)
+            except KeyboardInterrupt:
+                self.stdout.write('Остановка: дожидаемся начатых задач.')
+
+    def serve(self, pool, options):
+        running = {}
+        while True:
+            free = options['workers'] - len(running)
+            for task_id in tasks.claim(free) if free else ():
+                running[pool.submit(tasks.execute, task_id)] = task_id
+            if not running:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+            done, _ = wait(
+                running, timeout=options['interval'],
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                task_id = running.pop(future)
+                self.report(task_id, future)
+
+    def report(self, task_id, future):
+        try:
+            status = future.result()
+        except Exception as error:
+            # Сбой вне задачи (например, потеряно соединение с БД):
+            # задачу заберут снова по NOTES_TASK_TIMEOUT.
+            self.stderr.write(f'Задача {task_id}: {error!r}')
+            return
+        self.stdout.write(f'Задача {task_id}: {status}.')
@@ -0,0 +1,231 @@
+"""Markdown в тексте заметок.
+
+Поддерживается подмножество Markdown: заголовки, абзацы (перевод строки
+сохраняется), ``**жирный**``, ``*курсив*``, ```код```, блоки кода в
+тройных обратных кавычках, маркированные и нумерованные списки, цитаты,
+горизонтальная черта и ссылки ``[текст](адрес)``.
+
+Исходный текст экранируется целиком, поэтому HTML из заметки в результат
+не попадает; ссылки допускаются только относительные и со схемами из
+``ALLOWED_SCHEMES``.
+
+``render_cached`` кеширует HTML по SHA-256 текста: неизменённая заметка
+повторно не рендерится, а у изменённой просто другой ключ.
+"""
+import re
+from hashlib import sha256
+from html import escape, unescape
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+# Меняется вместе с правилами рендеринга: старые записи кеша не читаются.
+RENDERER_VERSION = 3
+CACHE_KEY = 'notes:markdown:{version}:{digest}'
+ALLOWED_SCHEMES = ('', 'http', 'https', 'mailto')
+
+FENCE_RE = re.compile(r'^\s*```')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE_RE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+QUOTE_RE = re.compile(r'^\s*>\s?(.*)$')
+# Глубже цитаты не вкладываются: остальные «>» выводятся текстом.
+MAX_QUOTE_DEPTH = 16
+LIST_RE = re.compile(r'^\s*(?:([-*+])|(\d+)[.)])\s+(.*)$')
+
+BACKTICKS_RE = re.compile(r'`+')
+# Тело выделения и ссылки не содержит своих разделителей: без
+# закрывающего разделителя поиск не доходит до конца строки от каждого
+# открывающего. Адрес не может содержать сохранённый код (\x00N\x00):
+# такая ссылка остаётся текстом.
+LINK_RE = re.compile(r'\[([^\[\]\n]+)\]\(([^()\s\x00]+)\)')
+STRONG_RE = re.compile(r'\*\*([^*\n]+)\*\*|(?<!\w)__([^_\n]+)__(?!\w)')
+EM_RE = re.compile(r'\*([^*\n]+)\*|(?<!\w)_([^_\n]+)_(?!\w)')
+TOKEN_RE = re.compile('\x00(\\d+)\x00')
+
+
+def _safe_url(url):
+    url = unescape(url)
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return None
+    return escape(url) if scheme in ALLOWED_SCHEMES else None
+
+
+def _code_spans(text, code):
+    """Заменяет код в обратных кавычках на ``code(body)``.
+
+    Код закрывает ближайшая следующая серия кавычек той же длины; серии
+    без пары остаются текстом. Пары находятся за один проход, без
+    регулярного выражения, которое искало бы закрывающую серию до конца
+    строки от каждой открывающей.
+    """
+    runs = [match.span() for match in BACKTICKS_RE.finditer(text)]
+    following = [None] * len(runs)
+    seen = {}
+    for index in range(len(runs) - 1, -1, -1):
+        start, end = runs[index]
+        following[index] = seen.get(end - start)
+        seen[end - start] = index
+    parts = []
+    position = index = 0
+    while index < len(runs):
+        closing = following[index]
+        if closing is None:
+            index += 1
+            continue
+        start, end = runs[index]
+        parts.append(text[position:start])
+        parts.append(code(text[end:runs[closing][0]]))
+        position = runs[closing][1]
+        index = closing + 1
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def render_inline(text):
+    """HTML строки текста: экранирование, код, ссылки и выделение."""
+    stash = []
+
+    def keep(html):
+        stash.append(html)
+        return f'\x00{len(stash) - 1}\x00'
+
+    def code(body):
+        return keep(f'<code>{escape(body.strip())}</code>')
+
+    def link(match):
+        url = _safe_url(match[2])
+        if url is None:
+            return match[0]
+        return keep(f'<a href="{url}" rel="nofollow noopener">{match[1]}</a>')
+
+    # Код сохраняется до экранирования: внутри него ничего не меняется.
+    text = _code_spans(text, code)
+    text = LINK_RE.sub(link, escape(text))
+    text = STRONG_RE.sub(
+        lambda match: f'<strong>{match[1] or match[2]}</strong>', text
+    )
+    text = EM_RE.sub(lambda match: f'<em>{match[1] or match[2]}</em>', text)
+    while TOKEN_RE.search(text):
+        text = TOKEN_RE.sub(lambda match: stash[int(match[1])], text)
+    return text
+
+
+def _paragraph(lines):
+    return '<p>' + '<br>\n'.join(map(render_inline, lines)) + '</p>'
+
+
+def _collect(lines, index, predicate):
+    """Строки подряд от ``index``, для которых ``predicate`` истинен."""
+    end = index
+    while end < len(lines) and predicate(lines[end]):
+        end += 1
+    return lines[index:end], end
+
+
+def _fence(lines, index, match, depth):
+    code, end = _collect(
+        lines, index + 1, lambda line: not FENCE_RE.match(line)
+    )
+    html = '<pre><code>' + escape('\n'.join(code)) + '</code></pre>'
+    # end + 1: пропускаем закрывающие кавычки.
+    return html, end + 1
+
+
+def _heading(lines, index, match, depth):
+    level = len(match[1])
+    return f'<h{level}>{render_inline(match[2])}</h{level}>', index + 1
+
+
+def _rule(lines, index, match, depth):
+    return '<hr>', index + 1
+
+
+def _quote(lines, index, match, depth):
+    quoted, end = _collect(lines, index, QUOTE_RE.match)
+    body = render_blocks(
+        [QUOTE_RE.match(line)[1] for line in quoted], depth + 1
+    )
+    return f'<blockquote>{body}</blockquote>', end
+
+
+def _list(lines, index, match, depth):
+    ordered = match[2] is not None
+
+    def same_list(line):
+        item = LIST_RE.match(line)
+        return item is not None and (item[2] is not None) == ordered
+
+    items, end = _collect(lines, index, same_list)
+    tag = 'ol' if ordered else 'ul'
+    body = ''.join(
+        f'<li>{render_inline(LIST_RE.match(item)[3])}</li>' for item in items
+    )
+    return f'<{tag}>{body}</{tag}>', end
+
+
+# Черта проверяется раньше списка: «* * *» — это не список.
+BLOCKS = (
+    (FENCE_RE, _fence),
+    (HEADING_RE, _heading),
+    (RULE_RE, _rule),
+    (QUOTE_RE, _quote),
+    (LIST_RE, _list),
+)
+
+
+def _match_block(line, depth):
+    for regex, render_block in BLOCKS:
+        if render_block is _quote and depth >= MAX_QUOTE_DEPTH:
+            continue
+        match = regex.match(line)
+        if match:
+            return render_block, match
+    return None
+
+
+def render_blocks(lines, depth=0):
+    """HTML блоков Markdown из списка строк.
+
+    ``depth`` — число цитат, внутри которых находятся строки.
+    """
+    blocks = []
+    paragraph = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        block = _match_block(line, depth)
+        if block is None and line.strip():
+            paragraph.append(line)
+            index += 1
+            continue
+        # Пустая строка или другой блок завершают абзац.
+        if paragraph:
+            blocks.append(_paragraph(paragraph))
+            paragraph = []
+        if block is None:
+            index += 1
+            continue
+        render_block, match = block
+        html, index = render_block(lines, index, match, depth)
+        blocks.append(html)
+    if paragraph:
+        blocks.append(_paragraph(paragraph))
+    return '\n'.join(blocks)
+
+
+def render(text):
+    """HTML текста в Markdown; HTML из самого текста экранируется."""
+    text = text.replace('\r\n', '\n').replace('\x00', '')
+    return mark_safe(render_blocks(text.split('\n')))
+
+
+def render_cached(text):
+    """``render(text)`` из кеша по хешу содержимого."""
+    key = CACHE_KEY.format(
+        version=RENDERER_VERSION,
+        digest=sha256(text.encode()).hexdigest(),
+    )
+    return mark_safe(cache.get_or_set(key, lambda: str(render(text)), None))
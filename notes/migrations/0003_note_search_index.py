@@ -0,0 +1,90 @@
+import re
+
+import snowballstemmer
+from django.db import migrations
+
+# Копия notes.search на момент миграции: история миграций не должна
+# меняться вместе с модулем.
+BATCH_SIZE = 1000
+WORD_RE = re.compile(r'\w+')
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE notes_note_fts USING fts5("
+    "title, text, author_id UNINDEXED)",
+    "CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note "
+    "BEGIN DELETE FROM notes_note_fts WHERE rowid = old.id; END",
+)
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS notes_note_fts_delete",
+    "DROP TABLE IF EXISTS notes_note_fts",
+)
+POSTGRES_CREATE = (
+    "CREATE INDEX note_search_idx ON notes_note USING GIN ("
+    "to_tsvector('russian', coalesce(title, '') || ' ' || "
+    "coalesce(text, '')))",
+)
+POSTGRES_DROP = (
+    "DROP INDEX IF EXISTS note_search_idx",
+)
+
+
+def stem_words(stemmer, text):
+    return stemmer.stemWords(WORD_RE.findall(text.lower().replace('ё', 'е')))
+
+
+def fill_search_index(Note, connection):
+    stemmer = snowballstemmer.stemmer('russian')
+    notes = Note._default_manager.using(connection.alias).values_list(
+        'id', 'title', 'text', 'author_id'
+    ).order_by('id')
+    last_id = 0
+    while batch := list(notes.filter(id__gt=last_id)[:BATCH_SIZE]):
+        last_id = batch[-1][0]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO notes_note_fts (rowid, title, text, author_id) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    (
+                        note_id,
+                        ' '.join(stem_words(stemmer, title)),
+                        ' '.join(stem_words(stemmer, text)),
+                        author_id,
+                    )
+                    for note_id, title, text, author_id in batch
+                ],
+            )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+        fill_search_index(
+            apps.get_model('notes', 'Note'), schema_editor.connection
+        )
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {
+        'sqlite': SQLITE_DROP,
+        'postgresql': POSTGRES_DROP,
+    }.get(vendor, ())
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# На SQLite AddField и AlterField пересобирают таблицу notes_note и
+# удаляют её триггеры, в том числе очистку индекса поиска из 0003.
+SQLITE_SEARCH_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS notes_note_fts_delete AFTER DELETE ON "
+    "notes_note BEGIN DELETE FROM notes_note_fts WHERE rowid = old.id; END"
+)
+
+
+def restore_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(SQLITE_SEARCH_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # При откате RemoveField снова пересобирает таблицу.
+        migrations.RunPython(migrations.RunPython.noop, restore_search_trigger),
+        migrations.AddField(
+            model_name='note',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'updated_at'], name='note_author_updated_idx'),
+        ),
+        migrations.RunPython(restore_search_trigger, migrations.RunPython.noop),
+    ]
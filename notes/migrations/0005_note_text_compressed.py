@@ -0,0 +1,112 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:29
+
+import sys
+import zlib
+
+import notes.fields
+from django.conf import settings
+from django.db import migrations
+
+# Копия notes.fields на момент миграции: история миграций не должна
+# меняться вместе с модулем.
+BATCH_SIZE = 1000
+COMPRESS_LEVEL = 6
+SELECT_BATCH = (
+    'SELECT id, text FROM notes_note WHERE id > %s ORDER BY id LIMIT %s'
+)
+UPDATE_TEXT = 'UPDATE notes_note SET text = %s WHERE id = %s'
+# На SQLite AlterField пересобирает таблицу notes_note и удаляет её
+# триггеры, в том числе очистку индекса поиска из 0003.
+SQLITE_SEARCH_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS notes_note_fts_delete AFTER DELETE ON "
+    "notes_note BEGIN DELETE FROM notes_note_fts WHERE rowid = old.id; END"
+)
+
+
+def restore_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(SQLITE_SEARCH_TRIGGER)
+
+
+def rewrite_texts(connection, convert):
+    """Заменяет тексты порциями по id на ``convert(text)``, если не None.
+
+    Сжатие есть только на SQLite: там BLOB и строка лежат в одной колонке.
+    """
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(SELECT_BATCH, (last_id, BATCH_SIZE))
+            batch = cursor.fetchall()
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            changed = []
+            for note_id, text in batch:
+                value = convert(text)
+                if value is not None:
+                    changed.append((value, note_id))
+            cursor.executemany(UPDATE_TEXT, changed)
+
+
+def format_report(count, raw_size, stored_size):
+    saved = raw_size - stored_size
+    percent = saved / raw_size * 100 if raw_size else 0
+    return (
+        f'Сжато текстов: {count}, {raw_size} -> {stored_size} байт, '
+        f'сэкономлено {saved} байт ({percent:.1f}%).'
+    )
+
+
+def compress_texts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    threshold = getattr(settings, 'NOTES_COMPRESS_THRESHOLD', 1024)
+    report = [0, 0, 0]
+
+    def compress(text):
+        if not isinstance(text, str):
+            return None
+        raw = text.encode()
+        if len(raw) <= threshold:
+            return None
+        compressed = zlib.compress(raw, COMPRESS_LEVEL)
+        report[0] += 1
+        report[1] += len(raw)
+        report[2] += len(compressed)
+        return compressed
+
+    rewrite_texts(schema_editor.connection, compress)
+    if report[0]:
+        sys.stdout.write(f'\n  {format_report(*report)}')
+
+
+def decompress_texts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    rewrite_texts(
+        schema_editor.connection,
+        lambda text: (
+            zlib.decompress(text).decode() if isinstance(text, bytes)
+            else None
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_updated_at'),
+    ]
+
+    operations = [
+        # При откате AlterField снова пересобирает таблицу.
+        migrations.RunPython(migrations.RunPython.noop, restore_search_trigger),
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+        migrations.RunPython(restore_search_trigger, migrations.RunPython.noop),
+        migrations.RunPython(compress_texts, decompress_texts),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:45
+
+import django.db.models.manager
+from django.conf import settings
+from django.db import migrations, models
+
+
+# На SQLite AddField пересобирает таблицу notes_note и удаляет её
+# триггеры, в том числе очистку индекса поиска из 0003. Заодно удаляются
+# записи индекса, оставшиеся в базах, где 0004 и 0005 выполнились до того,
+# как стали восстанавливать триггер.
+SQLITE_RESTORE_SEARCH_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS notes_note_fts_delete AFTER DELETE ON "
+    "notes_note BEGIN DELETE FROM notes_note_fts WHERE rowid = old.id; END",
+    "DELETE FROM notes_note_fts WHERE rowid NOT IN (SELECT id FROM notes_note)",
+)
+
+
+def restore_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_RESTORE_SEARCH_TRIGGER:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_notetask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # При откате RemoveField снова пересобирает таблицу.
+        migrations.RunPython(migrations.RunPython.noop, restore_search_trigger),
+        migrations.AlterModelOptions(
+            name='note',
+            options={'default_manager_name': 'all_objects'},
+        ),
+        migrations.AlterModelManagers(
+            name='note',
+            managers=[
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='deleted',
+            field=models.BooleanField(default=False, verbose_name='Удалена'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('deleted', True)), fields=['id'], name='note_deleted_idx'),
+        ),
+        migrations.RunPython(restore_search_trigger, migrations.RunPython.noop),
+    ]
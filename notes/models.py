@@ -1,7 +1,27 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.utils import timezone
 
-from pytils.translit import slugify
+from . import cache, markdown, search, slugs
+from .fields import CompressedTextField
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def metadata(self):
+        """Заметки без текста: для списков, подтверждений и поиска по slug.
+
+        Текст бывает большим, его читают только заметка подробно, форма
+        редактирования и выгрузка.
+        """
+        return self.defer('text')
+
+
+class NoteManager(models.Manager.from_queryset(NoteQuerySet)):
+    """Заметки без помеченных на удаление (notes.purge)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted=False)
 
 
 class Note(models.Model):
@@ -11,7 +31,9 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    # Большие тексты хранятся сжатыми и распаковываются при чтении
+    # атрибута (notes.fields).
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -27,12 +49,132 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
+    # Удалённая заметка сразу пропадает из objects, а из таблицы её
+    # удаляет фоновая задача purge (notes.purge).
+    deleted = models.BooleanField('Удалена', default=False)
+
+    objects = NoteManager()
+    # Все заметки, включая удалённые: проверки уникальности slug, админка.
+    all_objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        default_manager_name = 'all_objects'
+        indexes = (
+            # Курсорная пагинация списка: WHERE author_id = ? AND id > ?
+            # ORDER BY id.
+            models.Index(
+                fields=('author', 'id'),
+                name='note_author_id_idx',
+            ),
+            # ETag списка: MAX(updated_at) по заметкам автора.
+            models.Index(
+                fields=('author', 'updated_at'),
+                name='note_author_updated_idx',
+            ),
+            # Поиск в админке по началу заголовка.
+            models.Index(fields=('title',), name='note_title_idx'),
+            # Выборка заметок для purge.
+            models.Index(
+                fields=('id',),
+                condition=models.Q(deleted=True),
+                name='note_deleted_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def text_html(self):
+        """Текст в HTML из Markdown, кешируется по хешу текста."""
+        return markdown.render_cached(self.text)
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            self._save_with_free_slug(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'title', 'text'} & set(update_fields):
+            search.index_note(self)
+        cache.invalidate(self.author_id, using=self._state.db)
+
+    def delete(self, *args, **kwargs):
+        note_id = self.pk
+        result = super().delete(*args, **kwargs)
+        search.unindex_notes((note_id,), using=self._state.db)
+        cache.invalidate(self.author_id, using=self._state.db)
+        return result
+
+    def _save_with_free_slug(self, *args, **kwargs):
+        """Сохраняет заметку с первым свободным slug из её заголовка."""
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = slugs.slugify(self.title)[:max_slug_length]
+        for number in range(1, slugs.MAX_ATTEMPTS + 1):
+            self.slug = slugs.suffixed(base, number, max_slug_length)
+            try:
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                slug_taken = type(self)._default_manager.using(
+                    using
+                ).filter(slug=self.slug).exists()
+                if not slug_taken:
+                    self.slug = ''
+                    raise
+        self.slug = ''
+        raise IntegrityError(
+            f'Не удалось подобрать свободный slug для «{self.title}».'
+        )
+
+
+class NoteTask(models.Model):
+    """Фоновая задача: очередь в БД для notes.tasks."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    kind = models.CharField('Вид задачи', max_length=32)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    payload = models.JSONField('Параметры', default=dict, blank=True)
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField('Запуск не раньше', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    result = models.JSONField('Результат', null=True, blank=True)
+    error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        indexes = (
+            # Выборка готовых к запуску задач исполнителем.
+            models.Index(
+                fields=('status', 'run_after'),
+                name='note_task_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.kind} #{self.id} ({self.status})'
@@ -0,0 +1,70 @@
+"""Удаление заметок: мягкое сразу, физическое — порциями.
+
+Удаление из интерфейса только помечает заметки флагом ``deleted`` одним
+UPDATE, а строки удаляет фоновая задача ``purge`` (notes.tasks). Строки
+удаляются сырыми ``DELETE ... WHERE id IN (...)`` по
+``NOTES_PURGE_BATCH_SIZE`` штук в отдельной транзакции каждая: без
+загрузки объектов и сигналов и без долгой блокировки базы. Индекс поиска
+очищается вместе с каждой порцией.
+
+Пока заметка не удалена физически, её slug остаётся занятым.
+"""
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache, search
+from .models import Note
+
+
+def get_batch_size():
+    return getattr(settings, 'NOTES_PURGE_BATCH_SIZE', 500)
+
+
+def soft_delete(queryset, author_id):
+    """Помечает заметки автора удалёнными и возвращает их число."""
+    count = queryset.update(deleted=True, updated_at=timezone.now())
+    if count:
+        cache.invalidate(author_id, using=queryset.db)
+    return count
+
+
+def purge(queryset, batch_size=None):
+    """Физически удаляет заметки ``queryset`` порциями, возвращает число."""
+    batch_size = batch_size or get_batch_size()
+    meta = queryset.model._meta
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(meta.db_table)
+    column = connection.ops.quote_name(meta.pk.column)
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    count = 0
+    while batch := list(ids[:batch_size]):
+        placeholders = ', '.join(['%s'] * len(batch))
+        with transaction.atomic(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE {column} IN ({placeholders})',
+                    batch,
+                )
+            search.unindex_notes(batch, using=queryset.db)
+        count += len(batch)
+    return count
+
+
+def purge_deleted(batch_size=None):
+    return purge(Note.all_objects.filter(deleted=True), batch_size)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def purge_author_notes(sender, instance, using, **kwargs):
+    """Перед удалением пользователя удаляет его заметки порциями.
+
+    Каскад ``on_delete=CASCADE`` выполняется после этого сигнала и
+    заметок уже не находит. Порции выполняются внутри транзакции удаления
+    пользователя, но каждый запрос затрагивает не больше
+    ``NOTES_PURGE_BATCH_SIZE`` строк.
+    """
+    purge(Note.all_objects.using(using).filter(author_id=instance.pk))
+    cache.invalidate(instance.pk, using=using)
@@ -1,11 +1,18 @@
 """Фиктуры тестов."""
 import pytest
 
+from django.core.cache import cache
 from django.test.client import Client
 
 from notes.models import Note
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очищает кеш: id объектов в тестовой БД повторяются между тестами."""
+    cache.clear()
+
+
 @pytest.fixture
 def author(django_user_model):
     """Создаёт и возвращает пользователя автора."""
@@ -60,3 +67,19 @@ def form_data():
         'text': 'Новый текст',
         'slug': 'new-slug'
     }
+
+
+@pytest.fixture
+def assert_view_queries(django_assert_num_queries):
+    """Выполняет запрос клиента и проверяет точное число SQL-запросов.
+
+    Ответ со streaming-содержимым дочитывается внутри проверки: запросы
+    к БД такого ответа выполняются при чтении.
+    """
+    def request(client, method, url, expected, data=None, **extra):
+        with django_assert_num_queries(expected):
+            response = getattr(client, method)(url, data, **extra)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response
+    return request
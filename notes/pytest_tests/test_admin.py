@@ -0,0 +1,81 @@
+"""Тесты админки заметок."""
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.admin import EstimatedCountPaginator
+from notes.models import Note, NoteTask
+
+pytestmark = pytest.mark.django_db
+
+CHANGELIST = reverse('admin:notes_note_changelist')
+
+
+def create_notes(author, count, start=0):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(start, start + count)
+    )
+
+
+def changelist_queries(admin_client, params=None):
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get(CHANGELIST, params)
+    assert response.status_code == HTTPStatus.OK
+    return response, context.captured_queries
+
+
+def test_changelist_queries_do_not_grow(admin_client, author):
+    """Число запросов не зависит от числа заметок и их авторов."""
+    create_notes(author, 3)
+    _, few = changelist_queries(admin_client)
+    create_notes(author, 30, start=3)
+    response, many = changelist_queries(admin_client)
+    assert len(few) == len(many)
+    assert 'Заметка 32' in response.content.decode()
+
+
+@mock.patch.object(EstimatedCountPaginator, 'limit', 5)
+def test_count_is_bounded(author):
+    create_notes(author, 10)
+    Note.all_objects.filter(slug='note-9').delete()
+    queryset = Note.all_objects.order_by('id')
+    # Оценка по наибольшему id без COUNT(*) по всей таблице.
+    assert EstimatedCountPaginator(queryset, 2).count == 9
+    filtered = queryset.filter(title__startswith='Заметка')
+    assert EstimatedCountPaginator(filtered, 2).count == 6
+
+
+@pytest.mark.parametrize('term', ('note-3', 'Заметка 3'))
+def test_search_by_indexed_fields(admin_client, author, term):
+    create_notes(author, 5)
+    response, _ = changelist_queries(admin_client, {'q': term})
+    assert list(response.context['cl'].result_list) == [
+        Note.objects.get(slug='note-3')
+    ]
+
+
+def test_author_raw_id_widget(admin_client, note):
+    response = admin_client.get(
+        reverse('admin:notes_note_change', args=(note.id,))
+    )
+    assert 'vForeignKeyRawIdAdminField' in response.content.decode()
+
+
+def test_batch_actions(admin_client, author):
+    create_notes(author, 3)
+    ids = list(Note.objects.values_list('id', flat=True)[:2])
+    admin_client.post(
+        CHANGELIST, {'action': 'mark_deleted', '_selected_action': ids}
+    )
+    assert Note.objects.count() == 1
+    assert NoteTask.objects.filter(kind='purge').exists()
+    admin_client.post(
+        CHANGELIST, {'action': 'restore', '_selected_action': ids}
+    )
+    assert Note.objects.count() == 3
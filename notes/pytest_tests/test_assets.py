@@ -0,0 +1,83 @@
+"""Тесты статических файлов и предварительной компиляции шаблонов."""
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.template import engines
+from django.test import RequestFactory
+from django.urls import reverse
+
+from yanote import staticfiles
+from yanote.template_cache import precompile_templates
+
+STORAGE = 'yanote.staticfiles.MinifiedManifestStaticFilesStorage'
+CACHED_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+def test_minify_css():
+    css = '/* комментарий */\na :hover,\nb > i {\n  color: red;\n}\n'
+    assert staticfiles.minify_css(css) == 'a :hover,b>i{color:red}'
+
+
+@pytest.mark.django_db
+def test_base_template_uses_local_css(client):
+    """Стили подключаются из статических файлов проекта, без CDN."""
+    content = client.get(reverse('notes:home')).content.decode()
+    assert '/static/css/yanote.css' in content
+    assert 'cdn.' not in content
+
+
+def test_collectstatic_minifies_and_hashes(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES, 'staticfiles': {'BACKEND': STORAGE},
+    }
+    call_command('collectstatic', interactive=False, verbosity=0)
+    manifest = json.loads((tmp_path / 'staticfiles.json').read_text())
+    hashed_name = manifest['paths']['css/yanote.css']
+    assert staticfiles.HASHED_NAME_RE.search(hashed_name)
+    css = (tmp_path / hashed_name).read_text()
+    assert '/*' not in css
+    assert '\n' not in css
+
+
+@pytest.mark.parametrize(
+    'name, cache_control',
+    (
+        ('yanote.0123456789ab.css', 'immutable'),
+        ('yanote.css', 'no-cache'),
+    ),
+)
+def test_serve_cache_headers(settings, tmp_path, name, cache_control):
+    """Файлы с хешем в имени кешируются на год, остальные проверяются."""
+    settings.STATIC_ROOT = tmp_path
+    (tmp_path / name).write_text('a{color:red}')
+    response = staticfiles.serve(RequestFactory().get('/'), name)
+    assert response.status_code == HTTPStatus.OK
+    assert cache_control in response['Cache-Control']
+
+
+def test_precompile_templates(settings):
+    """Все шаблоны компилируются в кеш загрузчика при запуске."""
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **settings.TEMPLATES[0]['OPTIONS'], 'loaders': CACHED_LOADERS,
+        },
+    }]
+    settings.TEMPLATES_PRECOMPILE = True
+    assert precompile_templates() > 0
+    loader = engines['django'].engine.template_loaders[0]
+    assert 'notes/list.html' in loader.get_template_cache
+
+
+def test_precompile_disabled(settings):
+    settings.TEMPLATES_PRECOMPILE = False
+    assert precompile_templates() == 0
@@ -0,0 +1,93 @@
+"""Тесты асинхронных представлений заметок."""
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+
+from notes import async_views
+from notes.forms import WARNING
+from notes.models import Note
+
+
+def call_view(view_class, user, method='get', data=None, **kwargs):
+    """Вызывает асинхронное представление и рендерит ответ."""
+    request = getattr(AsyncRequestFactory(), method)('/', data)
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    response = async_to_sync(view_class.as_view())(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+@pytest.mark.django_db
+def test_anonymous_user_redirected():
+    """Анонимный пользователь перенаправляется на страницу входа."""
+    response = call_view(async_views.NotesList, AnonymousUser())
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url.startswith(reverse('users:login'))
+
+
+def test_list_shows_only_author_notes(author, not_author, note):
+    """Список содержит только заметки пользователя."""
+    response = call_view(async_views.NotesList, author)
+    assert note in response.context_data['object_list']
+    response = call_view(async_views.NotesList, not_author)
+    assert note not in response.context_data['object_list']
+
+
+def test_detail_for_different_users(author, not_author, note):
+    """Заметка доступна только автору."""
+    response = call_view(async_views.NoteDetail, author, slug=note.slug)
+    assert response.status_code == HTTPStatus.OK
+    assert note.text in response.content.decode()
+    with pytest.raises(Http404):
+        call_view(async_views.NoteDetail, not_author, slug=note.slug)
+
+
+def test_create_note(author, form_data):
+    """Создание заметки."""
+    response = call_view(async_views.NoteCreate, author, 'post', form_data)
+    assertRedirects(
+        response, reverse('notes:success'), fetch_redirect_response=False
+    )
+    new_note = Note.objects.get()
+    assert new_note.slug == form_data['slug']
+    assert new_note.author == author
+
+
+def test_create_note_with_taken_slug(author, note, form_data):
+    """Занятый slug превращается в ошибку формы."""
+    form_data['slug'] = note.slug
+    response = call_view(async_views.NoteCreate, author, 'post', form_data)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context_data['form'].errors['slug'] == [
+        note.slug + WARNING
+    ]
+    assert Note.objects.count() == 1
+
+
+def test_update_and_delete_note(author, note, form_data):
+    """Изменение и удаление заметки автором."""
+    call_view(
+        async_views.NoteUpdate, author, 'post', form_data, slug=note.slug
+    )
+    note.refresh_from_db()
+    assert note.text == form_data['text']
+    call_view(async_views.NoteDelete, author, 'post', slug=note.slug)
+    assert not Note.objects.exists()
+
+
+def test_other_user_cant_delete_note(not_author, note):
+    """Не автор не может удалить заметку."""
+    with pytest.raises(Http404):
+        call_view(async_views.NoteDelete, not_author, 'post', slug=note.slug)
+    assert Note.objects.count() == 1
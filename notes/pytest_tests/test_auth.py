@@ -0,0 +1,84 @@
+"""Тесты кеша пользователя сессии и хеширования паролей."""
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.cache import cache
+from django.urls import reverse
+
+from notes import auth
+from yanote.hashers import PROFILES, ScryptPasswordHasher
+
+pytestmark = pytest.mark.django_db
+
+
+def cached_user(user):
+    return cache.get(auth.USER_KEY.format(user_id=user.pk))
+
+
+def test_login_caches_user(author, author_client):
+    assert cached_user(author) == author
+
+
+def test_cached_user_is_minimal(author, author_client):
+    """При промахе кеша загружаются только нужные на каждом запросе поля."""
+    cache.clear()
+    user = auth.CachedModelBackend().get_user(author.pk)
+    assert 'email' in user.get_deferred_fields()
+    assert cached_user(author) == user
+
+
+def test_logout_invalidates_user(author, author_client):
+    author_client.post(reverse('users:logout'))
+    assert cached_user(author) is None
+
+
+@pytest.mark.parametrize(
+    'change',
+    (
+        lambda user: user.set_password('new-password'),
+        lambda user: setattr(user, 'is_active', False),
+    ),
+    ids=('password', 'inactive'),
+)
+def test_user_change_invalidates_session(author, author_client, change):
+    """Смена пароля или блокировка сразу завершает старые сессии."""
+    url = reverse('notes:list')
+    assert author_client.get(url).status_code == HTTPStatus.OK
+    change(author)
+    author.save()
+    assert cached_user(author) is None
+    assert author_client.get(url).status_code == HTTPStatus.FOUND
+
+
+def test_tests_use_fast_hasher():
+    assert make_password('password').startswith('md5$')
+
+
+def test_rehash_on_login(settings, client, author):
+    """При входе старый хеш прозрачно заменяется хешем профиля."""
+    settings.PASSWORD_HASHERS = PROFILES['production']
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**10
+    hasher = PBKDF2PasswordHasher()
+    author.password = hasher.encode('password', hasher.salt(), iterations=1)
+    author.save()
+    assert client.login(username=author.username, password='password')
+    author.refresh_from_db()
+    assert author.password.startswith('scrypt$1024$')
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**11
+    assert client.login(username=author.username, password='password')
+    author.refresh_from_db()
+    assert author.password.startswith('scrypt$2048$')
+
+
+def test_old_hash_checked_after_lowering_work_factor(settings, client, author):
+    """Хеш с work_factor больше текущего проверяется и перехешируется."""
+    settings.PASSWORD_HASHERS = PROFILES['production']
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**15
+    author.set_password('password')
+    author.save()
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**14
+    assert ScryptPasswordHasher().verify('password', author.password)
+    assert client.login(username=author.username, password='password')
+    author.refresh_from_db()
+    assert author.password.startswith('scrypt$16384$')
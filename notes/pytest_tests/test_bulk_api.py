@@ -0,0 +1,135 @@
+"""Тесты пакетного JSON API."""
+import json
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+from pytils.translit import slugify
+
+from notes.forms import WARNING
+from notes.models import Note
+
+URL = reverse('notes:api_bulk')
+
+
+def post_batch(client, payload):
+    return client.post(
+        URL, data=json.dumps(payload), content_type='application/json'
+    )
+
+
+def test_bulk_create_update_delete(author_client, author, note):
+    """Пакет создаёт, изменяет и удаляет заметки за один запрос."""
+    other = Note.objects.create(
+        title='Другая', text='Текст', slug='other', author=author
+    )
+    response = post_batch(author_client, {
+        'create': [
+            {'title': 'Первая', 'text': 'Раз', 'slug': 'first'},
+            {'title': 'Вторая', 'text': 'Два'},
+        ],
+        'update': [{'slug': note.slug, 'text': 'Изменённый текст'}],
+        'delete': [other.slug],
+    })
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()
+    assert [item['status'] for item in results['create']] == [
+        'created', 'created'
+    ]
+    assert results['create'][1]['slug'] == slugify('Вторая')
+    assert results['update'][0]['status'] == 'updated'
+    assert results['delete'][0]['status'] == 'deleted'
+    note.refresh_from_db()
+    assert note.text == 'Изменённый текст'
+    assert set(Note.objects.values_list('slug', flat=True)) == {
+        note.slug, 'first', slugify('Вторая')
+    }
+
+
+def test_bulk_reports_errors_per_item(author_client, note, not_author):
+    """Ошибки возвращаются для отдельных элементов пакета."""
+    foreign = Note.objects.create(
+        title='Чужая', text='Текст', slug='foreign', author=not_author
+    )
+    response = post_batch(author_client, {
+        'create': [
+            {'title': 'Без текста'},
+            {'title': 'Занятый', 'text': 'Текст', 'slug': note.slug},
+            {'title': 'Годная', 'text': 'Текст'},
+        ],
+        'update': [{'slug': foreign.slug, 'text': 'Взлом'}],
+        'delete': [foreign.slug],
+    })
+    results = response.json()
+    assert 'text' in results['create'][0]['errors']
+    assert results['create'][1]['errors'] == {
+        'slug': [note.slug + WARNING]
+    }
+    assert results['create'][2]['status'] == 'created'
+    assert results['update'][0]['status'] == 'error'
+    assert results['delete'][0]['status'] == 'error'
+    foreign.refresh_from_db()
+    assert foreign.text == 'Текст'
+
+
+def test_bulk_suffixes_duplicate_titles(author_client, note):
+    """Одинаковые заголовки в пакете получают разные slug."""
+    title = note.title
+    Note.objects.filter(pk=note.pk).update(slug=slugify(title))
+    response = post_batch(author_client, {
+        'create': [{'title': title, 'text': 'Текст'}] * 2,
+    })
+    slugs = [item['slug'] for item in response.json()['create']]
+    assert slugs == [f'{slugify(title)}-2', f'{slugify(title)}-3']
+
+
+def test_bulk_create_query_count(
+        author_client, django_assert_max_num_queries
+):
+    """Число запросов не зависит от размера пакета."""
+    payload = {
+        'create': [
+            {'title': f'Заметка {index}', 'text': 'Текст'}
+            for index in range(100)
+        ]
+    }
+    with django_assert_max_num_queries(10):
+        response = post_batch(author_client, payload)
+    assert response.status_code == HTTPStatus.OK
+    assert Note.objects.count() == 100
+
+
+def test_bulk_create_full_batch_of_taken_titles(author_client, author):
+    """Повторная загрузка полного пакета уже существующих заголовков."""
+    size = 1000
+    Note.objects.bulk_create(
+        Note(title=f'Title {index}', text='Текст', slug=f'title-{index}',
+             author=author)
+        for index in range(size)
+    )
+    response = post_batch(author_client, {
+        'create': [
+            {'title': f'Title {index}', 'text': 'Текст'}
+            for index in range(size)
+        ]
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert [item['slug'] for item in response.json()['create']] == [
+        f'title-{index}-2' for index in range(size)
+    ]
+
+
+@pytest.mark.parametrize('body', ('не json', '[]', '{"create": 1}'))
+def test_bulk_rejects_malformed_payload(author_client, body):
+    """Некорректный пакет отклоняется целиком."""
+    response = author_client.post(
+        URL, data=body, content_type='application/json'
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_for_anonymous_user(client):
+    """API недоступно анонимному пользователю."""
+    response = post_batch(client, {'create': []})
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,47 @@
+"""Тесты кеширования заметок."""
+from django.urls import reverse
+
+
+def test_warm_list_runs_no_queries(
+        note, author_client, django_assert_num_queries
+):
+    """Прогретый список не обращается к БД."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    # Сессия и пользователь тоже берутся из кеша.
+    with django_assert_num_queries(0):
+        response = author_client.get(url)
+    assert note in response.context['object_list']
+
+
+def test_warm_detail_runs_no_queries(
+        slug_for_args, author_client, django_assert_num_queries
+):
+    """Прогретая заметка не обращается к БД."""
+    url = reverse('notes:detail', args=slug_for_args)
+    author_client.get(url)
+    with django_assert_num_queries(0):
+        author_client.get(url)
+
+
+def test_edit_invalidates_cache(note, author_client, form_data):
+    """Изменение заметки сбрасывает кеш списка и страницы заметки."""
+    list_url = reverse('notes:list')
+    author_client.get(list_url)
+    author_client.get(reverse('notes:detail', args=(note.slug,)))
+    author_client.post(reverse('notes:edit', args=(note.slug,)), form_data)
+    response = author_client.get(list_url)
+    assert form_data['title'] in response.content.decode()
+    response = author_client.get(
+        reverse('notes:detail', args=(form_data['slug'],))
+    )
+    assert form_data['text'] in response.content.decode()
+
+
+def test_delete_invalidates_list_cache(note, author_client):
+    """Удаление заметки сбрасывает кеш списка."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    author_client.post(reverse('notes:delete', args=(note.slug,)))
+    response = author_client.get(url)
+    assert note not in response.context['object_list']
@@ -0,0 +1,84 @@
+"""Тесты сжатого хранения текста заметок."""
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from notes.export import export_notes
+from notes.fields import (CompressedText, compress_existing, format_report,
+                          get_threshold)
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+LOG = 'ERROR 2024-01-01 12:00:00 соединение разорвано\n' * 200
+
+
+def stored_text(note):
+    """Значение колонки text как оно лежит в БД."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT text FROM notes_note WHERE id = %s', (note.id,)
+        )
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def log_note(author):
+    return Note.objects.create(title='Лог', text=LOG, author=author)
+
+
+def test_large_text_stored_compressed(log_note, note):
+    """Большой текст хранится сжатым, короткий — как есть."""
+    stored = stored_text(log_note)
+    assert isinstance(stored, bytes)
+    assert len(stored) < len(LOG.encode()) / 10
+    assert stored_text(note) == note.text
+
+
+def test_text_decompressed_lazily(log_note):
+    """Текст распаковывается только при обращении к атрибуту."""
+    note = Note.objects.get(id=log_note.id)
+    assert isinstance(note.__dict__['text'], CompressedText)
+    assert note.text == LOG
+    assert note.__dict__['text'] == LOG
+
+
+def test_save_keeps_compressed_text(log_note):
+    """Повторное сохранение оставляет текст сжатым и неизменным."""
+    stored = stored_text(log_note)
+    note = Note.objects.get(id=log_note.id)
+    note.title = 'Новый лог'
+    note.save()
+    assert stored_text(note) == stored
+    assert Note.objects.get(id=note.id).text == LOG
+
+
+@pytest.mark.parametrize('name', ('notes:detail', 'notes:edit'))
+def test_views_show_text(author_client, log_note, name):
+    """Заметка и форма редактирования показывают распакованный текст."""
+    response = author_client.get(reverse(name, args=(log_note.slug,)))
+    assert 'соединение разорвано' in response.content.decode()
+
+
+def test_export_decompresses_text(log_note):
+    """Выгрузка через values_list() распаковывает текст."""
+    content = b''.join(export_notes(Note.objects.all(), 'ndjson'))
+    assert 'соединение разорвано' in content.decode()
+
+
+def test_compress_existing(log_note, note):
+    """Ранее сохранённые без сжатия тексты сжимаются порциями."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'UPDATE notes_note SET text = %s WHERE id = %s',
+            (LOG, log_note.id),
+        )
+    count, raw_size, stored_size = compress_existing(
+        Note, 'text', batch_size=1
+    )
+    assert count == 1
+    assert raw_size == len(LOG.encode()) > get_threshold()
+    assert stored_size == len(stored_text(log_note))
+    assert stored_text(note) == note.text
+    assert Note.objects.get(id=log_note.id).text == LOG
+    assert 'Сжато текстов: 1' in format_report(count, raw_size, stored_size)
@@ -0,0 +1,90 @@
+"""Тесты условных GET-запросов."""
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+from pytest_lazy_fixtures import lf
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:list', None),
+        ('notes:detail', lf('slug_for_args')),
+    )
+)
+def test_unchanged_page_not_modified(author_client, name, args):
+    """Повторный запрос с ETag неизменной страницы получает 304."""
+    url = reverse(name, args=args)
+    response = author_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    response = author_client.get(
+        url, headers={'If-None-Match': response['ETag']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.content
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:list', None),
+        ('notes:detail', lf('slug_for_args')),
+    )
+)
+def test_new_login_invalidates_etag(author_client, author, name, args):
+    """После нового входа страница с формами отдаётся с новым токеном."""
+    url = reverse(name, args=args)
+    etag = author_client.get(url)['ETag']
+    author_client.logout()
+    author_client.force_login(author)
+    response = author_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_detail_if_modified_since(author_client, slug_for_args):
+    """Заметка отдаёт Last-Modified и учитывает If-Modified-Since."""
+    url = reverse('notes:detail', args=slug_for_args)
+    response = author_client.get(url)
+    response = author_client.get(
+        url, headers={'If-Modified-Since': response['Last-Modified']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:list', None),
+        ('notes:detail', lf('slug_for_args')),
+    )
+)
+def test_changed_note_invalidates_etag(author_client, note, name, args):
+    """После изменения заметки страница отдаётся заново."""
+    url = reverse(name, args=args)
+    etag = author_client.get(url)['ETag']
+    note.text = 'Новый текст'
+    note.save()
+    response = author_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_deleted_note_invalidates_list_etag(author_client, note):
+    """Удаление заметки меняет ETag списка."""
+    url = reverse('notes:list')
+    etag = author_client.get(url)['ETag']
+    note.delete()
+    response = author_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_not_modified_list_skips_note_queries(
+        author_client, note, django_assert_num_queries
+):
+    """Ответ 304 для прогретого списка не обращается к заметкам."""
+    url = reverse('notes:list')
+    etag = author_client.get(url)['ETag']
+    with django_assert_num_queries(0):
+        author_client.get(url, headers={'If-None-Match': etag})
@@ -5,6 +5,8 @@ from django.urls import reverse
 from pytest_lazy_fixtures import lf
 
 from notes.forms import NoteForm
+from notes.models import Note
+from notes.views import NotesList
 
 
 @pytest.mark.parametrize(
@@ -37,3 +39,37 @@ def test_pages_contains_form(author_client, name, args):
     response = author_client.get(url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], NoteForm)
+
+
+def test_notes_list_paginated_by_cursor(author, author_client):
+    """Список выводится страницами по курсору."""
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст',
+             slug=f'note-{index}', author=author)
+        for index in range(NotesList.page_size + 1)
+    )
+    url = reverse('notes:list')
+    response = author_client.get(url)
+    first_page = response.context['object_list']
+    next_cursor = response.context['next_cursor']
+    assert len(first_page) == NotesList.page_size
+    assert next_cursor == first_page[-1].id
+    response = author_client.get(url, {'after': next_cursor})
+    second_page = response.context['object_list']
+    assert len(second_page) == 1
+    assert second_page[0].id > next_cursor
+    assert response.context['next_cursor'] is None
+
+
+def test_notes_list_defers_text(note, author_client):
+    """Список не загружает текст заметок."""
+    response = author_client.get(reverse('notes:list'))
+    listed_note = response.context['object_list'][0]
+    assert 'text' in listed_note.get_deferred_fields()
+
+
+def test_delete_page_defers_text(note, author_client, slug_for_args):
+    """Подтверждение удаления не загружает и не выводит текст заметки."""
+    response = author_client.get(reverse('notes:delete', args=slug_for_args))
+    assert 'text' in response.context['note'].get_deferred_fields()
+    assert note.text not in response.content.decode()
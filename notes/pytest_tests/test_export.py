@@ -0,0 +1,60 @@
+"""Тесты выгрузки заметок."""
+import csv
+import io
+import json
+import zipfile
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+
+def get_export(client, fmt):
+    response = client.get(reverse('notes:export', args=(fmt,)))
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    return b''.join(response.streaming_content)
+
+
+def test_export_ndjson(author_client, note, not_author):
+    """NDJSON содержит только заметки автора, по строке на заметку."""
+    content = get_export(author_client, 'ndjson')
+    rows = [json.loads(line) for line in content.decode().splitlines()]
+    assert [row['slug'] for row in rows] == [note.slug]
+    assert rows[0]['text'] == note.text
+
+
+def test_export_csv(author_client, note):
+    """CSV начинается с заголовка и содержит заметку."""
+    content = get_export(author_client, 'csv').decode()
+    header, row = csv.reader(io.StringIO(content))
+    assert header == ['slug', 'title', 'text', 'updated_at']
+    assert row[:3] == [note.slug, note.title, note.text]
+
+
+def test_export_markdown_zip(author_client, note):
+    """ZIP содержит Markdown-файл, названный по slug заметки."""
+    content = get_export(author_client, 'zip')
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.namelist() == [f'{note.slug}.md']
+        markdown = archive.read(f'{note.slug}.md').decode()
+    assert markdown == f'# {note.title}\n\n{note.text}\n'
+
+
+def test_export_unknown_format(author_client):
+    """Неизвестный формат выгрузки."""
+    response = author_client.get(reverse('notes:export', args=('xml',)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_export_command(tmp_path, author, note):
+    """Команда export_notes пишет выгрузку в файл."""
+    output = tmp_path / 'notes.ndjson'
+    call_command(
+        'export_notes', author.username, '--format', 'ndjson',
+        '--output', str(output),
+    )
+    row = json.loads(output.read_text())
+    assert row['slug'] == note.slug
@@ -0,0 +1,78 @@
+"""Тесты пакетной загрузки заметок."""
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from pytils.translit import slugify
+
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ndjson_file(tmp_path):
+    path = tmp_path / 'notes.ndjson'
+    path.write_text('\n'.join(
+        json.dumps({'title': f'Заметка {index}', 'text': 'Текст'})
+        for index in range(5)
+    ), encoding='utf-8')
+    return path
+
+
+def test_import_ndjson(author, ndjson_file):
+    """Загрузка NDJSON порциями."""
+    call_command(
+        'import_notes', author.username, str(ndjson_file),
+        '--batch-size', '2', stdout=mock.MagicMock(),
+    )
+    assert Note.objects.filter(author=author).count() == 5
+    assert not ndjson_file.with_name('notes.ndjson.checkpoint').exists()
+
+
+def test_import_csv_deduplicates_slugs(author, note, tmp_path):
+    """Slug из файла и заголовков не конфликтуют с существующими."""
+    path = tmp_path / 'notes.csv'
+    path.write_text(
+        'title,text,slug\n'
+        f'Заметка,Текст,{note.slug}\n'
+        'Заметка,Текст,\n'
+        'Заметка,Текст,\n',
+        encoding='utf-8',
+    )
+    call_command(
+        'import_notes', author.username, str(path), stdout=mock.MagicMock()
+    )
+    expected = slugify('Заметка')
+    assert set(Note.objects.values_list('slug', flat=True)) == {
+        note.slug, f'{note.slug}-2', expected, f'{expected}-2'
+    }
+
+
+def test_import_resumes_from_checkpoint(author, ndjson_file):
+    """После сбоя загрузка продолжается с контрольной точки."""
+    bulk_create = Note.objects.bulk_create
+    calls = []
+
+    def failing_bulk_create(notes, **kwargs):
+        calls.append(notes)
+        if len(calls) == 2:
+            raise RuntimeError('Сбой БД')
+        return bulk_create(notes, **kwargs)
+
+    with mock.patch.object(
+            Note.objects, 'bulk_create', failing_bulk_create
+    ), pytest.raises(RuntimeError):
+        call_command(
+            'import_notes', author.username, str(ndjson_file),
+            '--batch-size', '2', stdout=mock.MagicMock(),
+        )
+    checkpoint = ndjson_file.with_name('notes.ndjson.checkpoint')
+    assert checkpoint.read_text() == '2'
+    call_command(
+        'import_notes', author.username, str(ndjson_file),
+        '--batch-size', '2', stdout=mock.MagicMock(),
+    )
+    titles = sorted(Note.objects.values_list('title', flat=True))
+    assert titles == [f'Заметка {index}' for index in range(5)]
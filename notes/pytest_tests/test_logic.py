@@ -96,3 +96,27 @@ def test_other_user_cant_delete_note(not_author_client, slug_for_args):
     response = not_author_client.post(url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Note.objects.count() == 1
+
+
+def test_empty_slug_taken_gets_suffix(author_client, author, form_data):
+    """Тест подбора свободного slug для одинаковых заголовков."""
+    url = reverse('notes:add')
+    form_data.pop('slug')
+    expected_slug = slugify(form_data['title'])
+    for _ in range(3):
+        response = author_client.post(url, data=form_data)
+        assertRedirects(response, reverse('notes:success'))
+    slugs = set(Note.objects.values_list('slug', flat=True))
+    assert slugs == {
+        expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'
+    }
+
+
+@pytest.mark.django_db
+def test_suffixed_slug_fits_max_length(author):
+    """Тест длины slug с суффиксом."""
+    title = 'з' * 100
+    first = Note.objects.create(title=title, text='Текст', author=author)
+    second = Note.objects.create(title=title, text='Текст', author=author)
+    assert len(first.slug) == len(second.slug) == 100
+    assert second.slug == first.slug[:98] + '-2'
@@ -0,0 +1,111 @@
+"""Тесты Markdown в тексте заметок."""
+import time
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+
+from notes import markdown
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('# Заголовок', '<h1>Заголовок</h1>'),
+        ('**жирный** и *курсив*', '<p><strong>жирный</strong> и '
+                                  '<em>курсив</em></p>'),
+        ('snake_case_name', '<p>snake_case_name</p>'),
+        ('`<b>` **', '<p><code>&lt;b&gt;</code> **</p>'),
+        ('строка\nещё', '<p>строка<br>\nещё</p>'),
+        ('- раз\n- два', '<ul><li>раз</li><li>два</li></ul>'),
+        ('1. раз\n2) два', '<ol><li>раз</li><li>два</li></ol>'),
+        ('> цитата', '<blockquote><p>цитата</p></blockquote>'),
+        ('* * *', '<hr>'),
+        ('```\n**код**\n```', '<pre><code>**код**</code></pre>'),
+        (
+            '[ссылка](https://ya.ru/?a=1&b=2)',
+            '<p><a href="https://ya.ru/?a=1&amp;b=2" '
+            'rel="nofollow noopener">ссылка</a></p>',
+        ),
+        ('[x](`y`)', '<p>[x](<code>y</code>)</p>'),
+        ('``a`b`` `c', '<p><code>a`b</code> `c</p>'),
+        ('__a__ _b_ a_b_', '<p><strong>a</strong> <em>b</em> a_b_</p>'),
+    ),
+)
+def test_render(text, expected):
+    assert markdown.render(text) == expected
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        '<script>alert(1)</script>',
+        '<img src=x onerror=alert(1)>',
+        '[x](javascript:alert(1))',
+        '[x](" onmouseover="alert(1))',
+        '```\n</code><script>alert(1)</script>\n```',
+    ),
+)
+def test_render_is_sanitized(text):
+    """HTML и опасные ссылки из текста в результат не попадают."""
+    html = markdown.render(text)
+    assert '<script' not in html
+    assert '<img' not in html
+    assert 'href="javascript' not in html
+    assert '" onmouseover' not in html
+
+
+def test_deep_quote_is_capped():
+    """Вложенность цитат ограничена, глубокая цитата не падает."""
+    for text in ('>' * 600, '> ' * 600, '\n'.join('>' * 600 for _ in '12')):
+        html = markdown.render(text)
+        assert html.count('<blockquote>') == markdown.MAX_QUOTE_DEPTH
+        assert '&gt;' in html
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        ' _a' * 20000,
+        ' __a' * 20000,
+        ' *a' * 20000,
+        ' **a' * 20000,
+        '[' * 60000,
+        ' [a' * 20000,
+        '![x](!' * 10000,
+        ''.join('`' * length + 'a' for length in range(1, 350)),
+        ''.join('`' * length + 'a' for length in range(350, 0, -1)),
+    ),
+)
+def test_render_unclosed_is_linear(text):
+    """Строка без закрывающих разделителей рендерится быстро."""
+    start = time.monotonic()
+    markdown.render(text)
+    assert time.monotonic() - start < 1
+
+
+def test_render_cached_by_content():
+    """Неизменённый текст рендерится один раз, изменённый — заново."""
+    with mock.patch.object(
+        markdown, 'render', wraps=markdown.render
+    ) as render:
+        first = markdown.render_cached('**текст**')
+        assert markdown.render_cached('**текст**') == first
+        assert render.call_count == 1
+        markdown.render_cached('**новый текст**')
+        assert render.call_count == 2
+
+
+@pytest.mark.django_db
+def test_detail_renders_markdown(author_client, note, slug_for_args):
+    """Страница заметки выводит Markdown как HTML, и правка его меняет."""
+    url = reverse('notes:detail', args=slug_for_args)
+    note.text = '**важно** <script>'
+    note.save()
+    content = author_client.get(url).content.decode()
+    assert '<strong>важно</strong> &lt;script&gt;' in content
+    author_client.post(
+        reverse('notes:edit', args=slug_for_args),
+        {'title': note.title, 'text': '*исправлено*', 'slug': note.slug},
+    )
+    assert '<em>исправлено</em>' in author_client.get(url).content.decode()
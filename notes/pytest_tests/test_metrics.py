@@ -0,0 +1,54 @@
+"""Тесты замеров производительности запросов."""
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+from django.urls import reverse
+
+from yanote.metrics import registry
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    """Включает замеры и очищает накопленные значения."""
+    settings.PERFORMANCE_METRICS = True
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def metrics_client(metrics_enabled, author):
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+def test_server_timing_header(metrics_client, note):
+    """Ответ содержит Server-Timing с SQL и шаблоном."""
+    response = metrics_client.get(reverse('notes:list'))
+    header = response['Server-Timing']
+    assert header.startswith('total;dur=')
+    assert 'db;dur=' in header
+    assert 'tpl;dur=' in header
+
+
+def test_prometheus_endpoint(metrics_client, note):
+    """Метрики накапливаются по именам представлений."""
+    metrics_client.get(reverse('notes:list'))
+    metrics_client.get(reverse('notes:detail', args=(note.slug,)))
+    response = metrics_client.get(reverse('metrics'))
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode()
+    assert 'yanote_requests_total{view="notes:list"} 1' in content
+    assert 'yanote_requests_total{view="notes:detail"} 1' in content
+    assert 'yanote_sql_queries_total{view="notes:list"}' in content
+
+
+@pytest.mark.django_db
+def test_metrics_disabled_by_default(client):
+    """Выключенные замеры не добавляют заголовок и скрывают /metrics/."""
+    response = client.get(reverse('notes:home'))
+    assert 'Server-Timing' not in response
+    response = client.get(reverse('metrics'))
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,97 @@
+"""Тесты мягкого удаления заметок и фонового purge."""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+
+from notes import purge, search, tasks
+from notes.forms import WARNING
+from notes.models import Note, NoteTask
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def notes(author):
+    return Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(5)
+    )
+
+
+def note_deletes(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('DELETE FROM "notes_note" WHERE "id" IN')
+    ]
+
+
+def test_delete_is_soft_until_purge(author_client, note, form_data):
+    response = author_client.post(reverse('notes:delete', args=(note.slug,)))
+    assertRedirects(response, reverse('notes:success'))
+    assert not Note.objects.exists()
+    assert Note.all_objects.get().deleted
+    # Slug освобождается только после purge.
+    response = author_client.post(
+        reverse('notes:add'), form_data | {'slug': note.slug}
+    )
+    assert response.context['form'].errors['slug'] == [note.slug + WARNING]
+    note_task = NoteTask.objects.get(kind='purge')
+    for task_id in tasks.claim(10):
+        tasks.run(task_id)
+    note_task.refresh_from_db()
+    assert note_task.result == {'deleted': 1}
+    assert not Note.all_objects.exists()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {search.FTS_TABLE}')
+        assert cursor.fetchone() == (0,)
+
+
+def test_bulk_delete_own_notes(author_client, notes, not_author):
+    other = Note.objects.create(
+        title='Чужая', text='Текст', slug='other', author=not_author
+    )
+    url = reverse('notes:bulk_delete')
+    author_client.post(url, {'ids': [notes[0].id, notes[1].id, other.id]})
+    author_client.post(url, {'ids': [notes[2].id, 'x']})
+    assert set(Note.objects.values_list('id', flat=True)) == {
+        notes[3].id, notes[4].id, other.id
+    }
+    # Одна задача purge на все удаления, пока она ждёт в очереди.
+    assert NoteTask.objects.filter(kind='purge').count() == 1
+
+
+def test_search_limit_skips_deleted(author, author_client, notes):
+    """Удалённые до purge заметки не занимают места в выдаче поиска."""
+    search.index_notes(notes)
+    purge.soft_delete(Note.objects.filter(id__in=[notes[0].id]), author.id)
+    found = search.search_notes(Note.objects.all(), author.id, 'заметка', 2)
+    assert len(found) == 2
+    assert notes[0] not in found
+
+
+def test_list_has_bulk_delete_form(author_client, note):
+    response = author_client.get(reverse('notes:list'))
+    assert reverse('notes:bulk_delete') in response.content.decode()
+
+
+def test_purge_in_batches(notes, author):
+    search.index_notes(notes)
+    purge.soft_delete(Note.objects.all(), author.id)
+    with CaptureQueriesContext(connection) as context:
+        assert purge.purge_deleted(batch_size=2) == 5
+    assert len(note_deletes(context)) == 3
+    assert not Note.all_objects.exists()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {search.FTS_TABLE}')
+        assert cursor.fetchone() == (0,)
+
+
+def test_user_delete_purges_notes_in_batches(settings, notes, author):
+    settings.NOTES_PURGE_BATCH_SIZE = 2
+    with CaptureQueriesContext(connection) as context:
+        author.delete()
+    assert len(note_deletes(context)) == 3
+    assert not Note.all_objects.exists()
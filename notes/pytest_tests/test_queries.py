@@ -0,0 +1,97 @@
+"""Тесты числа SQL-запросов представлений заметок.
+
+Сессия и пользователь берутся из кеша (cached_db и notes.auth), поэтому
+здесь считаются только обращения к заметкам. Кеш заметок очищается
+перед каждым тестом, поэтому здесь проверяются холодные запросы;
+прогретый кеш проверяется в test_cache.py.
+"""
+import pytest
+from django.urls import reverse
+from pytest_lazy_fixtures import lf
+
+from notes import cache, tasks
+from notes.models import Note
+
+NOTE_DATA = {'title': 'Новая', 'text': 'Текст'}
+# Представления, которые принимают тело запроса в JSON.
+JSON_VIEWS = {'notes:api_bulk'}
+
+
+@pytest.fixture
+def export_task(settings, tmp_path, author):
+    """Выполненная фоновая выгрузка заметок автора."""
+    settings.NOTES_TASK_ROOT = tmp_path
+    note_task = tasks.enqueue('export', author, format='csv')
+    return tasks.run(note_task.id)
+
+
+@pytest.mark.parametrize(
+    'method, name, args, data, expected',
+    (
+        ('get', 'notes:home', None, None, 0),
+        ('get', 'notes:success', None, None, 0),
+        # Агрегат для ETag и одна выборка страницы.
+        ('get', 'notes:list', None, None, 2),
+        ('get', 'notes:detail', lf('slug_for_args'), None, 1),
+        ('get', 'notes:add', None, None, 0),
+        ('get', 'notes:edit', lf('slug_for_args'), None, 1),
+        ('get', 'notes:delete', lf('slug_for_args'), None, 1),
+        # Точка сохранения, вставка, индекс поиска.
+        ('post', 'notes:add', None, {**NOTE_DATA, 'slug': 'new'}, 4),
+        # Для подбора slug — ещё одна точка сохранения.
+        ('post', 'notes:add', None, NOTE_DATA, 6),
+        (
+            'post', 'notes:edit', lf('slug_for_args'),
+            {**NOTE_DATA, 'slug': 'note-slug'}, 5
+        ),
+        # Пометка удалённой и задача purge, если её ещё нет в очереди.
+        ('post', 'notes:delete', lf('slug_for_args'), None, 4),
+        # Пометка удалённых одним UPDATE и задача purge.
+        ('post', 'notes:bulk_delete', None, {'ids': [lf('note.id')]}, 3),
+        ('get', 'notes:search', None, {'q': 'текст'}, 2),
+        ('get', 'notes:api_search', None, {'q': 'текст'}, 2),
+        ('get', 'notes:export', ('ndjson',), None, 1),
+        # Занятые slug, изменяемые заметки, вставка, одно UPDATE и
+        # индекс поиска в точке сохранения.
+        (
+            'post', 'notes:api_bulk', None,
+            {'create': [NOTE_DATA], 'update': [
+                {'slug': lf('note.slug'), 'text': 'Новый текст'}
+            ]}, 7
+        ),
+        # Поиск по slug, удаление заметок и их строк индекса.
+        ('post', 'notes:api_bulk', None, {'delete': [lf('note.slug')]}, 6),
+        ('post', 'notes:api_tasks', None, {'kind': 'export'}, 1),
+        ('get', 'notes:api_task', (lf('export_task.id'),), None, 1),
+        ('get', 'notes:task_download', (lf('export_task.id'),), None, 1),
+    )
+)
+def test_view_query_count(
+        author_client, note, assert_view_queries,
+        method, name, args, data, expected
+):
+    """Число SQL-запросов каждого представления."""
+    url = reverse(name, args=args)
+    extra = {'content_type': 'application/json'} if name in JSON_VIEWS else {}
+    assert_view_queries(author_client, method, url, expected, data, **extra)
+
+
+@pytest.mark.parametrize('notes_count', (1, 10, 1000))
+def test_list_query_count_is_constant(
+        author, author_client, assert_view_queries, notes_count
+):
+    """Число запросов списка не зависит от числа заметок."""
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст',
+             slug=f'note-{index}', author=author)
+        for index in range(notes_count)
+    )
+    url = reverse('notes:list')
+    response = assert_view_queries(author_client, 'get', url, 2)
+    next_cursor = response.context['next_cursor']
+    if next_cursor:
+        # Холодный кеш заметок, но не сессии и пользователя.
+        cache.invalidate(author.id)
+        assert_view_queries(
+            author_client, 'get', url, 2, {'after': next_cursor}
+        )
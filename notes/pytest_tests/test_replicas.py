@@ -0,0 +1,91 @@
+"""Тесты чтения заметок с реплик базы данных."""
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import router
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from notes.models import Note
+from yanote import replicas
+
+
+@pytest.fixture
+def replica_settings(settings):
+    """Подключает роутер; реплика — сама тестовая база."""
+    settings.DATABASE_ROUTERS = ['yanote.replicas.ReplicaRouter']
+    settings.DATABASE_REPLICAS = ['default']
+    settings.MIDDLEWARE = [
+        *settings.MIDDLEWARE, 'yanote.replicas.ReplicaMiddleware'
+    ]
+    return settings
+
+
+@pytest.fixture
+def replica_reads(replica_settings):
+    """Считает чтения, отправленные роутером на реплики."""
+    with mock.patch.object(
+        replicas, 'choice', wraps=replicas.choice
+    ) as choice:
+        yield choice
+
+
+@pytest.mark.parametrize(
+    'method, cookies, expected',
+    (
+        ('get', {}, 'replica'),
+        ('post', {}, 'default'),
+        ('get', {replicas.STICKY_COOKIE: '1'}, 'default'),
+    ),
+)
+def test_router_read_database(replica_settings, method, cookies, expected):
+    """На реплику уходят только чтения GET-запроса без cookie."""
+    replica_settings.DATABASE_REPLICAS = ['replica']
+    request = getattr(RequestFactory(), method)('/')
+    request.COOKIES.update(cookies)
+    assert router.db_for_read(Note) == 'default'
+    with replicas.read_from_replica(request):
+        assert router.db_for_read(Note) == expected
+        assert router.db_for_write(Note) == 'default'
+    assert router.db_for_read(Note) == 'default'
+
+
+@pytest.mark.parametrize(
+    'name, uses_replica',
+    (
+        ('notes:list', True),
+        ('notes:detail', True),
+        ('notes:edit', False),
+        ('notes:delete', False),
+    ),
+)
+def test_views_read_from_replica(
+    replica_reads, author_client, note, name, uses_replica
+):
+    """Список и заметка читаются с реплики, формы — с основной базы."""
+    # Создание заметки в фикстуре — недавнее изменение автора.
+    cache.delete(replicas.WRITTEN_KEY.format(user_id=note.author_id))
+    args = () if name == 'notes:list' else (note.slug,)
+    author_client.get(reverse(name, args=args))
+    assert replica_reads.called is uses_replica
+
+
+def test_write_makes_user_reads_sticky(
+    replica_reads, author_client, author, not_author_client, form_data
+):
+    """После изменения все клиенты пользователя читают с основной базы."""
+    author_client.post(reverse('notes:add'), data=form_data)
+    other_device = Client()
+    other_device.force_login(author)
+    response = other_device.get(reverse('notes:list'))
+    assert not replica_reads.called
+    assert form_data['title'] in response.content.decode()
+    not_author_client.get(reverse('notes:list'))
+    assert replica_reads.called
+
+
+def test_anonymous_write_sets_cookie(replica_settings, client):
+    response = client.post(reverse('users:logout'))
+    cookie = response.cookies[replicas.STICKY_COOKIE]
+    assert cookie['max-age'] == replicas.get_sticky_seconds()
@@ -70,3 +70,10 @@ def test_redirects(client, name, args):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+def test_notes_list_bad_cursor(author_client):
+    """Тест неверного курсора страницы списка."""
+    url = reverse('notes:list')
+    response = author_client.get(url, {'after': 'abc'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
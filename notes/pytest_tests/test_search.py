@@ -0,0 +1,75 @@
+"""Тесты полнотекстового поиска."""
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from pytest_lazy_fixtures import lf
+
+from notes import search
+
+
+def indexed_ids():
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT rowid FROM {search.FTS_TABLE}')
+        return {row[0] for row in cursor.fetchall()}
+
+
+@pytest.mark.parametrize(
+    'query, found',
+    (
+        ('заметки', True),
+        ('ЗАМЕТКАМИ', True),
+        ('тексты', True),
+        ('пингвин', False),
+        ('', False),
+    )
+)
+def test_search_stems_russian_words(note, author_client, query, found):
+    """Поиск находит заметку по разным словоформам."""
+    response = author_client.get(reverse('notes:search'), {'q': query})
+    assert (note in response.context['object_list']) is found
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, found',
+    (
+        (lf('author_client'), True),
+        (lf('not_author_client'), False),
+    )
+)
+def test_search_api_scoped_to_author(note, parametrized_client, found):
+    """API поиска возвращает только заметки автора."""
+    response = parametrized_client.get(
+        reverse('notes:api_search'), {'q': 'текст'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    slugs = [result['slug'] for result in response.json()['results']]
+    assert (note.slug in slugs) is found
+
+
+def test_search_index_follows_update_and_delete(note, author_client):
+    """Индекс обновляется при сохранении и удалении заметки."""
+    url = reverse('notes:api_search')
+    note.text = 'Про пингвинов'
+    note.save()
+    assert author_client.get(url, {'q': 'пингвин'}).json()['results']
+    assert not author_client.get(url, {'q': 'текст'}).json()['results']
+    note.delete()
+    assert not author_client.get(url, {'q': 'пингвин'}).json()['results']
+
+
+def test_delete_unindexes_without_trigger(note, author_client):
+    """Индекс очищается и без триггера, удалённого пересборкой таблицы."""
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER notes_note_fts_delete')
+    assert note.id in indexed_ids()
+    note.delete()
+    assert not indexed_ids()
+
+
+@pytest.mark.django_db
+def test_search_api_for_anonymous_user(client):
+    """API поиска недоступно анонимному пользователю."""
+    response = client.get(reverse('notes:api_search'), {'q': 'текст'})
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,46 @@
+"""Тесты генерации slug."""
+import random
+
+import pytest
+from pytils.translit import slugify as pytils_slugify
+
+from notes import slugs
+
+TITLES = (
+    'Заголовок',
+    'Список покупок на Ёлку — №5',
+    '«Важно!» & срочно &amp; сегодня',
+    'Съездить  на\tдачу - - итоги',
+    'Python_Django 2024… “черновик”',
+    'Ünïcödé ẞ KİΣ',
+    '',
+    '   ',
+)
+
+
+@pytest.mark.parametrize('title', TITLES)
+def test_slugify_matches_pytils(title):
+    """Результат совпадает с pytils."""
+    assert slugs.slugify(title) == pytils_slugify(title)
+
+
+def test_slugify_matches_pytils_on_random_text():
+    """Совпадение с pytils на случайных строках."""
+    rng = random.Random(0)
+    alphabet = [chr(code) for code in range(1, 0x500)] + list('&;—…№«» ')
+    titles = [
+        ''.join(rng.choices(alphabet, k=rng.randint(0, 20)))
+        for _ in range(2000)
+    ]
+    expected = [pytils_slugify(title) for title in titles]
+    assert [slugs.slugify(title) for title in titles] == expected
+    assert slugs.slugify_many(titles) == expected
+
+
+def test_slugify_many_with_separator_in_title():
+    """Заголовок с символом-разделителем обрабатывается отдельно."""
+    titles = ['а -\0- б', 'в']
+    assert slugs.slugify_many(titles) == [
+        pytils_slugify(title) for title in titles
+    ]
+    assert slugs.slugify_many([]) == []
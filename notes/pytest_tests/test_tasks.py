@@ -0,0 +1,174 @@
+"""Тесты фоновых задач заметок."""
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from notes import tasks
+from notes.models import Note, NoteTask
+
+pytestmark = pytest.mark.django_db
+
+Status = NoteTask.Status
+
+
+@pytest.fixture(autouse=True)
+def task_root(settings, tmp_path):
+    settings.NOTES_TASK_ROOT = tmp_path
+    return tmp_path
+
+
+def fail(note_task):
+    raise RuntimeError('сбой')
+
+
+def stale_time(settings):
+    return timezone.now() - timedelta(
+        seconds=settings.NOTES_TASK_TIMEOUT + 1
+    )
+
+
+def run_all():
+    """Выполняет готовые задачи в текущем потоке, как исполнитель."""
+    for task_id in tasks.claim(10):
+        tasks.run(task_id)
+
+
+def test_enqueue_unknown_kind():
+    with pytest.raises(ValueError):
+        tasks.enqueue('unknown')
+
+
+def test_claim_takes_task_once():
+    note_task = tasks.enqueue('reindex')
+    assert tasks.claim(10) == [note_task.id]
+    assert tasks.claim(10) == []
+    note_task.refresh_from_db()
+    assert note_task.status == Status.RUNNING
+    assert note_task.attempts == 1
+
+
+def test_stale_task_reclaimed(settings):
+    """Задачу зависшего исполнителя забирает другой."""
+    note_task = tasks.enqueue('reindex')
+    tasks.claim(10)
+    NoteTask.objects.filter(id=note_task.id).update(
+        locked_at=stale_time(settings)
+    )
+    assert tasks.claim(10) == [note_task.id]
+
+
+def test_crashing_task_fails_after_max_attempts(settings):
+    """Задачу, исполнитель которой падал на каждой попытке, не забирают."""
+    settings.NOTES_TASK_MAX_ATTEMPTS = 1
+    note_task = tasks.enqueue('reindex')
+    tasks.claim(10)
+    NoteTask.objects.filter(id=note_task.id).update(
+        locked_at=stale_time(settings)
+    )
+    assert tasks.claim(10) == []
+    note_task.refresh_from_db()
+    assert note_task.status == Status.FAILED
+    assert note_task.attempts == 1
+
+
+def test_heartbeat_prevents_reclaim(settings):
+    """Долгая задача продлевает блокировку и не выполняется дважды."""
+
+    def slow(note_task):
+        note_task.locked_at = stale_time(settings)
+        NoteTask.objects.filter(id=note_task.id).update(
+            locked_at=note_task.locked_at
+        )
+        tasks.heartbeat(note_task)
+        return {'reclaimed': tasks.claim(10)}
+
+    with mock.patch.dict(tasks.TASKS, {'slow': slow}):
+        note_task = tasks.enqueue('slow')
+        run_all()
+    note_task.refresh_from_db()
+    assert note_task.result == {'reclaimed': []}
+
+
+@mock.patch.dict(tasks.TASKS, {'fail': fail})
+def test_retry_with_backoff(settings):
+    """Упавшая задача откладывается с растущей задержкой, затем failed."""
+    settings.NOTES_TASK_MAX_ATTEMPTS = 2
+    note_task = tasks.enqueue('fail')
+    started = timezone.now()
+    run_all()
+    note_task.refresh_from_db()
+    assert note_task.status == Status.PENDING
+    assert note_task.error == 'RuntimeError: сбой'
+    assert note_task.run_after >= started + timedelta(
+        seconds=tasks.retry_delay(1)
+    )
+    assert tasks.retry_delay(2) == 2 * tasks.retry_delay(1)
+    NoteTask.objects.filter(id=note_task.id).update(run_after=started)
+    run_all()
+    note_task.refresh_from_db()
+    assert note_task.status == Status.FAILED
+    assert note_task.attempts == 2
+
+
+def test_export_task_api(author_client, not_author_client, note):
+    """Выгрузка ставится в очередь, статус опрашивается, файл отдаётся."""
+    response = author_client.post(
+        reverse('notes:api_tasks'), {'kind': 'export', 'format': 'csv'}
+    )
+    assert response.status_code == HTTPStatus.ACCEPTED
+    status_url = response.json()['url']
+    assert author_client.get(status_url).json()['status'] == Status.PENDING
+    assert not_author_client.get(status_url).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    run_all()
+    data = author_client.get(status_url).json()
+    assert data['status'] == Status.DONE
+    response = author_client.get(data['download'])
+    content = b''.join(response.streaming_content).decode()
+    assert note.title in content
+
+
+def test_import_task_api(author_client, author):
+    upload = SimpleUploadedFile(
+        'notes.ndjson',
+        '{"title": "Из файла", "text": "Текст"}\n'.encode(),
+    )
+    response = author_client.post(
+        reverse('notes:api_tasks'), {'kind': 'import', 'file': upload}
+    )
+    assert response.status_code == HTTPStatus.ACCEPTED
+    run_all()
+    note_task = NoteTask.objects.get()
+    assert note_task.result == {'rows': 1, 'created': 1}
+    assert Note.objects.filter(author=author, title='Из файла').exists()
+
+
+@pytest.mark.parametrize(
+    'data',
+    (
+        {'kind': 'unknown'},
+        {'kind': 'export', 'format': 'xml'},
+        {'kind': 'import'},
+    ),
+)
+def test_task_api_bad_request(author_client, data):
+    response = author_client.post(reverse('notes:api_tasks'), data)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert not NoteTask.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_note_worker(author, note):
+    """Исполнитель выполняет задачи в пуле потоков и завершается."""
+    note_task = tasks.enqueue('reindex', author)
+    call_command('run_note_worker', '--once', '--workers', '2')
+    note_task.refresh_from_db()
+    assert note_task.status == Status.DONE
+    assert note_task.result == {'notes': 1}
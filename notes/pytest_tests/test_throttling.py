@@ -0,0 +1,81 @@
+"""Тесты лимита частоты изменений и ключей идемпотентности."""
+from http import HTTPStatus
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from notes import throttling
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(
+    autouse=True,
+    params=('notes.throttling.LocalBuckets', 'notes.throttling.CacheBuckets'),
+)
+def buckets(request, settings):
+    """Корзина на два запроса без заметного пополнения во время теста."""
+    settings.NOTES_THROTTLE_BACKEND = request.param
+    settings.NOTES_THROTTLE_BURST = 2
+    settings.NOTES_THROTTLE_RATE = 0.01
+    backend = throttling.get_backend()
+    if hasattr(backend, 'clear'):
+        backend.clear()
+    return backend
+
+
+def test_take_from_refills():
+    state, wait = throttling.take_from(None, 0, rate=1, burst=2)
+    assert (state, wait) == ((1, 0), 0)
+    state, wait = throttling.take_from(state, 0, rate=1, burst=2)
+    state, wait = throttling.take_from(state, 0.25, rate=1, burst=2)
+    assert wait == 0.75
+    state, wait = throttling.take_from(state, 100, rate=1, burst=2)
+    assert (state, wait) == ((1, 100), 0)
+
+
+def test_writes_throttled_per_user(
+    author_client, not_author_client, note, form_data
+):
+    url = reverse('notes:edit', args=(note.slug,))
+    for _ in range(2):
+        assert author_client.post(url, form_data).status_code == (
+            HTTPStatus.FOUND
+        )
+        url = reverse('notes:edit', args=(form_data['slug'],))
+    response = author_client.post(url, form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) > 0
+    # Чтение не ограничено, у другого пользователя своя корзина.
+    assert author_client.get(url).status_code == HTTPStatus.OK
+    assert not_author_client.post(
+        reverse('notes:add'), form_data | {'slug': 'other'}
+    ).status_code == HTTPStatus.FOUND
+
+
+def test_idempotent_retry_replays_response(author_client, author, form_data):
+    url = reverse('notes:add')
+    responses = [
+        author_client.post(url, form_data, HTTP_IDEMPOTENCY_KEY='abc')
+        for _ in range(3)
+    ]
+    assert {response.status_code for response in responses} == {
+        HTTPStatus.FOUND
+    }
+    assert Note.objects.filter(author=author).count() == 1
+    # Повторы не расходуют маркеры.
+    assert author_client.post(
+        url, form_data | {'slug': 'second'}
+    ).status_code == HTTPStatus.FOUND
+
+
+def test_concurrent_retry_conflicts(author_client, author, form_data):
+    url = reverse('notes:add')
+    request = RequestFactory().post(url, HTTP_IDEMPOTENCY_KEY='abc')
+    response, key = throttling.begin(request, author.id)
+    assert response is None
+    response = author_client.post(url, form_data, HTTP_IDEMPOTENCY_KEY='abc')
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert not Note.objects.exists()
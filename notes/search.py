@@ -0,0 +1,150 @@
+"""Полнотекстовый поиск по заметкам.
+
+На SQLite используется виртуальная таблица FTS5, в которую попадают уже
+стеммированные (snowball, русский язык) заголовок и текст заметки. На
+PostgreSQL поиск идёт по GIN-индексу над ``to_tsvector('russian', ...)``.
+Для остальных СУБД остаётся запасной вариант через ``icontains``.
+"""
+import re
+import threading
+
+import snowballstemmer
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'notes_note_fts'
+PG_CONFIG = 'russian'
+PG_VECTOR = (
+    "to_tsvector('russian', coalesce(title, '') || ' ' || "
+    "coalesce(text, ''))"
+)
+
+WORD_RE = re.compile(r'\w+')
+
+_local = threading.local()
+
+
+def _stemmer():
+    """Стеммер snowball не потокобезопасен: держим свой на поток."""
+    if not hasattr(_local, 'stemmer'):
+        _local.stemmer = snowballstemmer.stemmer(PG_CONFIG)
+    return _local.stemmer
+
+
+def stem_words(text):
+    """Возвращает список основ слов текста."""
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return _stemmer().stemWords(words)
+
+
+def _document(note):
+    return (
+        note.id,
+        ' '.join(stem_words(note.title)),
+        ' '.join(stem_words(note.text)),
+        note.author_id,
+    )
+
+
+def index_notes(notes, using='default'):
+    """Добавляет или обновляет заметки в индексе FTS5."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} '
+            '(rowid, title, text, author_id) VALUES (%s, %s, %s, %s)',
+            [_document(note) for note in notes]
+        )
+
+
+def unindex_notes(ids, using='default'):
+    """Удаляет заметки с id из ``ids`` из индекса FTS5.
+
+    Триггер из миграции 0003 делает то же самое, но пересборка таблицы
+    на SQLite (AddField, AlterField) его удаляет, поэтому удаление заметок
+    не полагается на него.
+    """
+    connection = connections[using]
+    ids = list(ids)
+    if connection.vendor != 'sqlite' or not ids:
+        return
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', ids
+        )
+
+
+def index_note(note):
+    """Синхронизирует одну заметку с индексом."""
+    index_notes((note,), using=note._state.db or 'default')
+
+
+def rebuild_index(model, using='default', batch_size=1000, on_batch=None):
+    """Перестраивает индекс FTS5 по всем заметкам модели ``model``.
+
+    ``on_batch()`` вызывается после каждой порции.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    notes = model._default_manager.using(using).only(
+        'id', 'title', 'text', 'author_id'
+    ).order_by('id').iterator(chunk_size=batch_size)
+    batch = []
+    for note in notes:
+        batch.append(note)
+        if len(batch) == batch_size:
+            index_notes(batch, using=using)
+            batch = []
+            if on_batch is not None:
+                on_batch()
+    index_notes(batch, using=using)
+
+
+def _match_expression(query):
+    """Переводит запрос пользователя в выражение MATCH для FTS5."""
+    return ' '.join(f'"{word}"' for word in stem_words(query))
+
+
+def search_notes(queryset, author_id, query, limit):
+    """Ищет заметки автора по запросу, лучшие совпадения первыми.
+
+    Queryset должен быть ограничен заметками того же автора: на SQLite
+    он используется только для загрузки найденных записей.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        expression = _match_expression(query)
+        if not expression:
+            return []
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        with connection.cursor() as cursor:
+            # Помеченные удалёнными заметки остаются в индексе до purge
+            # (notes.purge) и отбрасываются до LIMIT по частичному индексу
+            # note_deleted_idx.
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND author_id = %s '
+                f'AND rowid NOT IN (SELECT id FROM {table} WHERE deleted) '
+                'ORDER BY rank LIMIT %s',
+                (expression, author_id, limit)
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        found = queryset.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+    if connection.vendor == 'postgresql':
+        condition = RawSQL(
+            f"{PG_VECTOR} @@ plainto_tsquery('{PG_CONFIG}', %s)",
+            (query,),
+            output_field=BooleanField(),
+        )
+        return list(queryset.filter(condition).order_by('-id')[:limit])
+    return list(queryset.filter(
+        Q(title__icontains=query) | Q(text__icontains=query)
+    ).order_by('-id')[:limit])
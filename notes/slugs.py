@@ -0,0 +1,115 @@
+"""Выбор slug для заметок.
+
+Уникальность slug обеспечивает ограничение в БД: заметка сразу
+вставляется с кандидатом, а при конфликте получает следующий суффикс
+(``-2``, ``-3``, …). Так обычная запись стоит одну вставку, а гонка
+двух одинаковых заголовков не заканчивается ошибкой.
+
+Для пакетной вставки (``bulk_create``) свободные slug подбираются заранее
+в памяти по множеству уже занятых значений.
+
+``slugify`` и ``slugify_many`` дают тот же результат, что и
+``pytils.translit.slugify``, но транслитерация и фильтрация символов
+выполняются одним ``str.translate`` по заранее собранной таблице.
+"""
+import re
+from functools import lru_cache
+
+from django.db.models import Q
+from pytils import translit
+
+MAX_ATTEMPTS = 100
+# Сколько занятых slug проверяется одним запросом в fetch_taken: длинная
+# цепочка OR упирается в предел глубины выражения SQLite (1000).
+PREFIX_BATCH_SIZE = 200
+
+AMPERSAND_RE = re.compile(r'&amp;|&')
+DASHES_RE = re.compile(r'[-\s]+')
+NOT_SLUG_RE = re.compile(r'[^\w\s-]')
+# Разделитель заголовков в slugify_many: pytils его отбрасывает, а
+# регулярные выражения выше его не затрагивают.
+SEPARATOR = '\0'
+
+
+class _SlugTable(dict):
+    """Таблица для str.translate: символы вне алфавита pytils удаляются."""
+
+    def __missing__(self, char):
+        return None
+
+
+def _build_table():
+    table = _SlugTable()
+    for char in translit.ALPHABET:
+        if len(char) != 1:
+            continue
+        # Тот же путь, что у символа внутри pytils.translit.slugify.
+        table[ord(char)] = NOT_SLUG_RE.sub('', translit.translify(
+            char, strict=False
+        )).lower() or None
+    return table
+
+
+TABLE = _build_table()
+BATCH_TABLE = _SlugTable({**TABLE, ord(SEPARATOR): SEPARATOR})
+
+
+def _prepare(text):
+    return DASHES_RE.sub('-', AMPERSAND_RE.sub(' and ', text.lower()))
+
+
+@lru_cache(maxsize=4096)
+def slugify(title):
+    """Slug из заголовка, совпадает с ``pytils.translit.slugify``."""
+    return _prepare(str(title)).translate(TABLE)
+
+
+def slugify_many(titles):
+    """Slug для списка заголовков за один проход по общей строке."""
+    titles = [str(title) for title in titles]
+    if not titles:
+        return []
+    if any(SEPARATOR in title for title in titles):
+        return [slugify(title) for title in titles]
+    return _prepare(SEPARATOR.join(titles)).translate(BATCH_TABLE).split(
+        SEPARATOR
+    )
+
+
+def suffixed(base, number, max_length):
+    """Возвращает ``number``-й вариант slug, не длиннее ``max_length``."""
+    if number == 1:
+        return base[:max_length]
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def fetch_taken(queryset, candidates):
+    """Возвращает занятые slug среди кандидатов и их вариантов с суффиксом.
+
+    Варианты ищутся, только если какой-то кандидат уже занят, по
+    ``PREFIX_BATCH_SIZE`` занятых slug за запрос. Вариант ``slug-N`` лежит
+    в диапазоне ``[slug-, slug.)``: такое сравнение, в отличие от LIKE,
+    использует уникальный индекс slug.
+    """
+    taken = set(
+        queryset.filter(slug__in=candidates).values_list('slug', flat=True)
+    )
+    found = sorted(taken)
+    for start in range(0, len(found), PREFIX_BATCH_SIZE):
+        ranges = Q()
+        for slug in found[start:start + PREFIX_BATCH_SIZE]:
+            ranges |= Q(slug__gte=f'{slug}-', slug__lt=f'{slug}.')
+        taken.update(queryset.filter(ranges).values_list('slug', flat=True))
+    return taken
+
+
+def allocate(base, taken, max_length):
+    """Первый свободный вариант ``base``; он сразу отмечается занятым."""
+    number = 1
+    slug = suffixed(base, number, max_length)
+    while slug in taken:
+        number += 1
+        slug = suffixed(base, number, max_length)
+    taken.add(slug)
+    return slug
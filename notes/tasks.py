@@ -0,0 +1,268 @@
+"""Фоновые задачи заметок без внешнего брокера.
+
+Очередь — таблица ``NoteTask``. Представления ставят задачи через
+``enqueue``, команда ``run_note_worker`` забирает их через ``claim`` и
+выполняет ``execute`` в пуле потоков или процессов. Клиенты опрашивают
+статус задачи по её id.
+
+Упавшая задача повторяется с экспоненциальной задержкой
+(``NOTES_TASK_RETRY_DELAY``, удваивается с каждой попыткой), после
+``NOTES_TASK_MAX_ATTEMPTS`` попыток получает статус ``failed``. Долгие
+задачи продлевают блокировку через ``heartbeat``; задачу, которая не
+продлевалась ``NOTES_TASK_TIMEOUT`` секунд (например, упал процесс),
+забирает другой исполнитель, пока не исчерпаны попытки.
+"""
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import export, fields, imports, purge, search
+from .models import Note, NoteTask
+
+Status = NoteTask.Status
+
+MAX_RETRY_DELAY = 60 * 60
+REINDEX_BATCH_SIZE = 1000
+
+TASKS = {}
+
+
+def task(kind):
+    """Регистрирует функцию ``function(task)`` как задачу вида ``kind``."""
+    def register(function):
+        TASKS[kind] = function
+        return function
+    return register
+
+
+def get_max_attempts():
+    return getattr(settings, 'NOTES_TASK_MAX_ATTEMPTS', 5)
+
+
+def get_timeout():
+    return getattr(settings, 'NOTES_TASK_TIMEOUT', 600)
+
+
+def get_root():
+    """Каталог файлов задач: загрузок и результатов выгрузки."""
+    root = Path(getattr(
+        settings, 'NOTES_TASK_ROOT', settings.BASE_DIR / 'task_files'
+    ))
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def retry_delay(attempts):
+    """Задержка перед повтором после ``attempts`` неудачных попыток, с."""
+    base = getattr(settings, 'NOTES_TASK_RETRY_DELAY', 10)
+    return min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def enqueue(kind, author=None, **payload):
+    """Ставит задачу в очередь и возвращает её."""
+    if kind not in TASKS:
+        raise ValueError(f'Неизвестная задача: {kind}.')
+    return NoteTask.objects.create(kind=kind, author=author, payload=payload)
+
+
+def enqueue_once(kind, author=None):
+    """Ставит задачу, если такая же ещё не ждёт в очереди."""
+    pending = NoteTask.objects.filter(
+        kind=kind, author=author, status=Status.PENDING
+    ).first()
+    return pending or enqueue(kind, author)
+
+
+def _stale(now):
+    return Q(
+        status=Status.RUNNING,
+        locked_at__lt=now - timedelta(seconds=get_timeout()),
+    )
+
+
+def _ready(now):
+    return Q(status=Status.PENDING, run_after__lte=now) | (
+        _stale(now) & Q(attempts__lt=get_max_attempts())
+    )
+
+
+def heartbeat(note_task, **fields):
+    """Продлевает блокировку выполняющейся задачи.
+
+    Долгие задачи вызывают его между порциями работы, иначе через
+    ``NOTES_TASK_TIMEOUT`` задачу забрал бы второй исполнитель. Без
+    ``fields`` запись в БД выполняется не чаще раза в десятую часть
+    таймаута.
+    """
+    now = timezone.now()
+    interval = timedelta(seconds=get_timeout() / 10)
+    if not fields and note_task.locked_at and (
+        now - note_task.locked_at < interval
+    ):
+        return
+    note_task.locked_at = now
+    NoteTask.objects.filter(id=note_task.id).update(locked_at=now, **fields)
+
+
+def claim(limit):
+    """Забирает до ``limit`` готовых задач и возвращает их id."""
+    now = timezone.now()
+    # Задача, исполнитель которой падал на каждой попытке, больше не
+    # повторяется.
+    NoteTask.objects.filter(
+        _stale(now), attempts__gte=get_max_attempts()
+    ).update(
+        status=Status.FAILED,
+        locked_at=None,
+        error='Исполнитель не завершил задачу за NOTES_TASK_TIMEOUT.',
+        updated_at=now,
+    )
+    candidates = NoteTask.objects.filter(_ready(now)).order_by(
+        'run_after', 'id'
+    ).values_list('id', flat=True)[:limit]
+    claimed = []
+    for task_id in candidates:
+        # Условное обновление: одну задачу забирает один исполнитель.
+        updated = NoteTask.objects.filter(_ready(now), id=task_id).update(
+            status=Status.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if updated:
+            claimed.append(task_id)
+    return claimed
+
+
+def run(task_id):
+    """Выполняет забранную задачу и сохраняет результат или ошибку."""
+    note_task = NoteTask.objects.select_related('author').get(id=task_id)
+    try:
+        result = TASKS[note_task.kind](note_task)
+    except Exception as error:
+        note_task.error = f'{type(error).__name__}: {error}'
+        if note_task.attempts < get_max_attempts():
+            note_task.status = Status.PENDING
+            note_task.run_after = timezone.now() + timedelta(
+                seconds=retry_delay(note_task.attempts)
+            )
+        else:
+            note_task.status = Status.FAILED
+    else:
+        note_task.status = Status.DONE
+        note_task.result = result
+        note_task.error = ''
+    note_task.locked_at = None
+    note_task.save(update_fields=(
+        'status', 'result', 'error', 'run_after', 'locked_at', 'updated_at',
+    ))
+    return note_task
+
+
+def execute(task_id):
+    """``run`` в потоке или процессе пула: соединения с БД не держим."""
+    try:
+        return run(task_id).status
+    finally:
+        connections.close_all()
+
+
+def describe(note_task):
+    """Статус задачи для клиента."""
+    return {
+        'id': note_task.id,
+        'kind': note_task.kind,
+        'status': note_task.status,
+        'attempts': note_task.attempts,
+        'result': note_task.result,
+        'error': note_task.error,
+        'created_at': note_task.created_at.isoformat(),
+        'updated_at': note_task.updated_at.isoformat(),
+    }
+
+
+def save_upload(upload, suffix):
+    """Сохраняет загруженный файл в каталог задач и возвращает путь."""
+    path = get_root() / f'{uuid4().hex}.{suffix}'
+    with path.open('wb') as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+    return path
+
+
+def export_path(note_task):
+    extension = export.FORMATS[note_task.payload['format']].extension
+    return get_root() / f'export-{note_task.id}.{extension}'
+
+
+@task('export')
+def export_notes(note_task):
+    """Выгрузка заметок автора в файл, который отдаёт NoteTaskDownload."""
+    path = export_path(note_task)
+    queryset = Note.objects.filter(author=note_task.author)
+    with path.open('wb') as output:
+        for chunk in export.export_notes(
+            queryset, note_task.payload['format']
+        ):
+            output.write(chunk)
+            heartbeat(note_task)
+    return {'size': path.stat().st_size}
+
+
+@task('import')
+def import_notes(note_task):
+    """Загрузка заметок из файла; повтор продолжает с последней порции."""
+    payload = note_task.payload
+    skip = payload.get('done', 0)
+
+    def on_batch(done, created):
+        # Как контрольная точка import_notes: порции уже закоммичены.
+        payload['done'] = skip + done
+        heartbeat(note_task, payload=payload)
+
+    path = Path(payload['path'])
+    with path.open(encoding='utf-8', newline='') as lines:
+        rows = islice(imports.read_rows(lines, payload['format']), skip, None)
+        done, created = imports.import_rows(
+            note_task.author, rows, on_batch=on_batch
+        )
+    path.unlink()
+    return {'rows': skip + done, 'created': created}
+
+
+@task('reindex')
+def reindex_notes(note_task):
+    """Перестраивает поисковый индекс заметок автора или всех заметок."""
+    if note_task.author is None:
+        search.rebuild_index(Note, on_batch=lambda: heartbeat(note_task))
+        return {'notes': Note.objects.count()}
+    notes = Note.objects.filter(author=note_task.author).only(
+        'id', 'title', 'text', 'author_id'
+    ).order_by('id').iterator(chunk_size=REINDEX_BATCH_SIZE)
+    count = 0
+    while batch := list(islice(notes, REINDEX_BATCH_SIZE)):
+        search.index_notes(batch)
+        count += len(batch)
+        heartbeat(note_task)
+    return {'notes': count}
+
+
+@task('compress')
+def compress_notes(note_task):
+    """Сжимает тексты заметок, сохранённые без сжатия."""
+    count, raw_size, stored_size = fields.compress_existing(Note, 'text')
+    return {
+        'count': count, 'raw_size': raw_size, 'stored_size': stored_size,
+    }
+
+
+@task('purge')
+def purge_notes(note_task):
+    """Физически удаляет заметки, помеченные удалёнными."""
+    return {'deleted': purge.purge_deleted()}
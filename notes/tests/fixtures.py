@@ -1,5 +1,6 @@
 """Фикстуры тестов."""
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -50,3 +51,7 @@ class BaseFixtures(TestCase):
             f'{cls.APP_NAME}:delete',
             args=(cls.note.slug,)
         )
+
+    def setUp(self):
+        """Очистка кеша: id объектов в тестовой БД повторяются."""
+        cache.clear()
@@ -0,0 +1,207 @@
+"""Ограничение частоты изменений заметок и идемпотентные повторы.
+
+Каждому пользователю выделяется корзина маркеров (token bucket): в ней до
+``NOTES_THROTTLE_BURST`` маркеров, и она пополняется на
+``NOTES_THROTTLE_RATE`` маркеров в секунду. POST-запрос забирает маркер,
+а если корзина пуста, получает 429 Too Many Requests с Retry-After.
+Корзины хранит бэкенд ``NOTES_THROTTLE_BACKEND``: ``LocalBuckets`` — в
+памяти процесса (лимит действует на каждый процесс отдельно),
+``CacheBuckets`` — в кеше Django, общем для всех процессов.
+
+Запрос с заголовком ``Idempotency-Key`` выполняется один раз: ответ
+сохраняется в кеше на ``NOTES_IDEMPOTENCY_TIMEOUT`` секунд, и повтор с
+тем же ключом получает его без повторной записи и без маркера. Повтор,
+пришедший, пока первый запрос ещё выполняется, получает 409 Conflict.
+"""
+import math
+import threading
+import time
+from functools import lru_cache, partial
+from hashlib import sha256
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+BUCKET_KEY = 'notes:throttle:{user_id}'
+IDEMPOTENCY_KEY = 'notes:idempotency:{user_id}:{digest}'
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Пока первый запрос выполняется, в кеше лежит этот маркер. Если процесс
+# упадёт, не записав ответ, маркер истечёт и запрос можно будет повторить.
+PENDING = 'pending'
+PENDING_TIMEOUT = 60
+
+
+def get_rate():
+    return getattr(settings, 'NOTES_THROTTLE_RATE', 1)
+
+
+def get_burst():
+    return getattr(settings, 'NOTES_THROTTLE_BURST', 10)
+
+
+def get_idempotency_timeout():
+    return getattr(settings, 'NOTES_IDEMPOTENCY_TIMEOUT', 24 * 60 * 60)
+
+
+def refill(state, now, rate, burst):
+    """Маркеры в корзине на момент ``now`` по сохранённому состоянию."""
+    if state is None:
+        return burst
+    tokens, updated = state
+    return min(burst, tokens + (now - updated) * rate)
+
+
+def take_from(state, now, rate, burst):
+    """Забирает маркер: новое состояние корзины и сколько секунд ждать."""
+    tokens = refill(state, now, rate, burst)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class LocalBuckets:
+    """Корзины в памяти процесса."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, user_id, rate, burst):
+        with self._lock:
+            state, wait = take_from(
+                self._buckets.get(user_id), time.monotonic(), rate, burst
+            )
+            self._buckets[user_id] = state
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBuckets:
+    """Корзины в кеше Django.
+
+    Чтение и запись не атомарны: при одновременных запросах одного
+    пользователя лимит может быть превышен на несколько запросов.
+    """
+
+    def take(self, user_id, rate, burst):
+        key = BUCKET_KEY.format(user_id=user_id)
+        state, wait = take_from(cache.get(key), time.time(), rate, burst)
+        # Полная корзина и отсутствие записи равнозначны.
+        cache.set(key, state, math.ceil(burst / rate))
+        return wait
+
+
+@lru_cache
+def _backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _backend(
+        getattr(
+            settings, 'NOTES_THROTTLE_BACKEND', 'notes.throttling.LocalBuckets'
+        )
+    )
+
+
+def too_many_requests(wait):
+    response = HttpResponse(
+        'Слишком много запросов, повторите позже.',
+        content_type='text/plain; charset=utf-8',
+        status=HTTPStatus.TOO_MANY_REQUESTS,
+    )
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def _idempotency_key(request, user_id):
+    value = request.headers.get(IDEMPOTENCY_HEADER)
+    if not value:
+        return None
+    # Ключ клиента привязан к адресу: один ключ для разных заметок —
+    # разные запросы.
+    digest = sha256(f'{request.path}\n{value}'.encode()).hexdigest()
+    return IDEMPOTENCY_KEY.format(user_id=user_id, digest=digest)
+
+
+def begin(request, user_id):
+    """Проверки перед выполнением POST-запроса пользователя.
+
+    Возвращает пару: готовый ответ (сохранённый, 409 или 429) или None,
+    если запрос нужно выполнить, и ключ идемпотентности для ``finish``.
+    """
+    key = _idempotency_key(request, user_id)
+    if key is not None and not cache.add(key, PENDING, PENDING_TIMEOUT):
+        response = cache.get(key)
+        if response == PENDING:
+            response = HttpResponse(
+                'Запрос с этим ключом ещё выполняется.',
+                content_type='text/plain; charset=utf-8',
+                status=HTTPStatus.CONFLICT,
+            )
+        if response is not None:
+            return response, None
+        # Запись истекла между add и get: выполняем запрос заново.
+        cache.set(key, PENDING, PENDING_TIMEOUT)
+    wait = get_backend().take(user_id, get_rate(), get_burst())
+    if wait:
+        if key is not None:
+            cache.delete(key)
+        return too_many_requests(wait), None
+    return None, key
+
+
+def _store(key, response):
+    if response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+        cache.set(key, response, get_idempotency_timeout())
+    else:
+        cache.delete(key)
+
+
+def finish(key, response):
+    """Сохраняет ответ по ключу идемпотентности (после рендеринга)."""
+    if key is None:
+        return response
+    if getattr(response, 'is_rendered', True):
+        _store(key, response)
+    else:
+        response.add_post_render_callback(partial(_store, key))
+    return response
+
+
+def fail(key):
+    """Снимает маркер, если запрос завершился исключением."""
+    if key is not None:
+        cache.delete(key)
+
+
+def protect(request, user_id, get_response):
+    """Выполняет POST-запрос ``get_response()`` с лимитом и ключом."""
+    response, key = begin(request, user_id)
+    if response is not None:
+        return response
+    try:
+        response = get_response()
+    except BaseException:
+        fail(key)
+        raise
+    return finish(key, response)
+
+
+async def aprotect(request, user_id, get_response):
+    response, key = await sync_to_async(begin)(request, user_id)
+    if response is not None:
+        return response
+    try:
+        response = await get_response()
+    except BaseException:
+        await sync_to_async(fail)(key)
+        raise
+    return await sync_to_async(finish)(key, response)
@@ -1,15 +1,45 @@
+from django.conf import settings
 from django.urls import path
 
-from notes import views
+from notes import async_views, views
 
 app_name = 'notes'
 
+# Под ASGI список, заметка и их изменение могут обслуживаться асинхронно.
+note_views = async_views if settings.NOTES_ASYNC_VIEWS else views
+
 urlpatterns = [
     path('', views.Home.as_view(), name='home'),
-    path('add/', views.NoteCreate.as_view(), name='add'),
-    path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
-    path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
-    path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
-    path('notes/', views.NotesList.as_view(), name='list'),
+    path('add/', note_views.NoteCreate.as_view(), name='add'),
+    path(
+        'edit/<slug:slug>/', note_views.NoteUpdate.as_view(), name='edit'
+    ),
+    path(
+        'note/<slug:slug>/', note_views.NoteDetail.as_view(), name='detail'
+    ),
+    path(
+        'delete/<slug:slug>/',
+        note_views.NoteDelete.as_view(),
+        name='delete',
+    ),
+    path('notes/', note_views.NotesList.as_view(), name='list'),
+    path('delete/', views.NoteBulkDelete.as_view(), name='bulk_delete'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path(
+        'api/search/', views.NoteSearchApi.as_view(), name='api_search'
+    ),
+    path('export/<str:fmt>/', views.NoteExport.as_view(), name='export'),
+    path('api/notes/bulk/', views.NoteBulkApi.as_view(), name='api_bulk'),
+    path('api/tasks/', views.NoteTaskCreateApi.as_view(), name='api_tasks'),
+    path(
+        'api/tasks/<int:pk>/',
+        views.NoteTaskStatusApi.as_view(),
+        name='api_task',
+    ),
+    path(
+        'tasks/<int:pk>/download/',
+        views.NoteTaskDownload.as_view(),
+        name='task_download',
+    ),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
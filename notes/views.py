@@ -1,9 +1,33 @@
+import json
+from hashlib import sha256
+from http import HTTPStatus
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import (FileResponse, Http404, HttpResponseRedirect,
+                         JsonResponse, StreamingHttpResponse)
+from django.middleware.csrf import get_token
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                quote_etag)
+from django.utils.http import http_date
 from django.views import generic
 
-from .forms import NoteForm
-from .models import Note
+from yanote import replicas
+
+from . import bulk, cache, export, imports, purge, tasks, throttling
+from .forms import WARNING, NoteForm
+from .models import Note, NoteTask
+from .search import search_notes
+
+
+def soft_delete_notes(queryset, author_id):
+    """Помечает заметки удалёнными и ставит в очередь их purge."""
+    count = purge.soft_delete(queryset, author_id)
+    if count:
+        tasks.enqueue_once('purge')
+    return count
 
 
 class Home(generic.TemplateView):
@@ -26,34 +50,391 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class ReplicaReadMixin:
+    """GET-запросы читают заметки с реплики базы (yanote.replicas)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replicas.read_from_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """Ответ 304 Not Modified без рендеринга, если у клиента свежая копия.
+
+    В ETag входит хеш секрета CSRF: на страницах есть формы с токеном, а
+    после выхода и входа секрет меняется, и копия с прежним токеном уже
+    не годится.
+    """
+
+    def get_validators(self):
+        """Возвращает ETag и время изменения страницы (или None)."""
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag:
+            get_token(request)
+            secret = sha256(request.META['CSRF_COOKIE'].encode()).hexdigest()
+            etag = quote_etag(f'{etag}-{secret[:16]}')
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag:
+            response.headers.setdefault('ETag', etag)
+        if timestamp:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class WriteThrottleMixin:
+    """Лимит частоты и ключ идемпотентности для POST (notes.throttling)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'POST' or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        return throttling.protect(
+            request, request.user.id,
+            lambda: super(WriteThrottleMixin, self).dispatch(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class NoteFormMixin(NoteBase):
+    """Сохранение заметки из формы одной вставкой или обновлением."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            # Явно указанный slug успели занять: других уникальных
+            # ограничений, которые может нарушить форма, у заметки нет.
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(WriteThrottleMixin, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(WriteThrottleMixin, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
-class NoteDelete(NoteBase, generic.DeleteView):
+class NoteDelete(WriteThrottleMixin, NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
+    def get_queryset(self):
+        """Для подтверждения и удаления текст заметки не нужен."""
+        return super().get_queryset().metadata()
+
+    def form_valid(self, form):
+        soft_delete_notes(
+            self.get_queryset().filter(pk=self.object.pk),
+            self.request.user.id,
+        )
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class NoteBulkDelete(WriteThrottleMixin, NoteBase, generic.View):
+    """Удаление заметок, отмеченных в списке (POST-параметр ``ids``)."""
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        ids = [pk for pk in request.POST.getlist('ids') if pk.isdigit()]
+        soft_delete_notes(
+            self.get_queryset().filter(id__in=ids), request.user.id
+        )
+        return HttpResponseRedirect(self.success_url)
+
 
-class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+class NotesList(
+    ReplicaReadMixin, ConditionalGetMixin, NoteBase, generic.ListView
+):
+    """Список всех заметок пользователя.
+
+    Постраничный вывод по курсору: страница начинается после заметки с id
+    из GET-параметра ``after``, поэтому любая страница стоит столько же,
+    сколько первая (индекс ``note_author_id_idx``).
+
+    ETag строится по числу заметок автора и времени последнего изменения.
+    Last-Modified не отдаётся: удаление заметки его не меняет.
+    """
     template_name = 'notes/list.html'
+    page_size = 50
+    cursor_kwarg = 'after'
+
+    def get_cursor(self):
+        """Возвращает id последней заметки предыдущей страницы."""
+        cursor = self.request.GET.get(self.cursor_kwarg) or 0
+        try:
+            return int(cursor)
+        except ValueError:
+            raise Http404('Неверный курсор страницы.')
+
+    def get_queryset(self):
+        """Загружаем только поля, которые выводятся в списке."""
+        return super().get_queryset().filter(
+            id__gt=self.get_cursor()
+        ).order_by('id').only('id', 'slug', 'title')
+
+    def get_validators(self):
+        user_id = self.request.user.id
+
+        def aggregate():
+            return super(NotesList, self).get_queryset().aggregate(
+                count=Count('id'), updated_at=Max('updated_at')
+            )
+
+        stats = cache.get_or_set(
+            cache.make_key('list-stats', user_id), aggregate
+        )
+        updated_at = stats['updated_at']
+        etag = '-'.join(map(str, (
+            'list', user_id, self.get_cursor(), stats['count'],
+            updated_at and updated_at.timestamp(),
+        )))
+        return etag, None
+
+    def get_page(self):
+        """Возвращает заметки страницы и курсор следующей страницы."""
+        notes = list(self.object_list[:self.page_size + 1])
+        next_cursor = None
+        if len(notes) > self.page_size:
+            notes = notes[:self.page_size]
+            next_cursor = notes[-1].id
+        return notes, next_cursor
 
+    def get_context_data(self, **kwargs):
+        key = cache.make_key('list', self.request.user.id, self.get_cursor())
+        notes, next_cursor = cache.get_or_set(key, self.get_page)
+        return super().get_context_data(
+            object_list=notes,
+            next_cursor=next_cursor,
+            cursor_kwarg=self.cursor_kwarg,
+            cache_key=key,
+            cache_timeout=cache.get_timeout(),
+            **kwargs
+        )
 
-class NoteDetail(NoteBase, generic.DetailView):
+
+class NoteDetail(
+    ReplicaReadMixin, ConditionalGetMixin, NoteBase, generic.DetailView
+):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get_validators(self):
+        note = self.get_object()
+        etag = f'note-{note.id}-{note.updated_at.timestamp()}'
+        return etag, note.updated_at
+
+    def get_object(self, queryset=None):
+        self.cache_key = cache.make_key(
+            'detail', self.request.user.id, self.kwargs[self.slug_url_kwarg]
+        )
+        return cache.get_or_set(
+            self.cache_key,
+            lambda: super(NoteDetail, self).get_object(queryset)
+        )
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            cache_key=self.cache_key,
+            cache_timeout=cache.get_timeout(),
+            **kwargs
+        )
+
+
+class NoteSearchMixin(NoteBase):
+    """Поиск по заметкам пользователя."""
+    query_kwarg = 'q'
+    results_limit = 50
+
+    def get_query(self):
+        return self.request.GET.get(self.query_kwarg, '').strip()
+
+    def get_queryset(self):
+        query = self.get_query()
+        if not query:
+            return []
+        return search_notes(
+            super().get_queryset().only('id', 'slug', 'title'),
+            self.request.user.id,
+            query,
+            self.results_limit,
+        )
+
+
+class NoteSearch(NoteSearchMixin, generic.ListView):
+    """Страница поиска по заметкам."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.get_query(), **kwargs)
+
+
+class NoteSearchApi(NoteSearchMixin, generic.View):
+    """Поиск по заметкам в формате JSON."""
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            'query': self.get_query(),
+            'results': [
+                {
+                    'id': note.id,
+                    'slug': note.slug,
+                    'title': note.title,
+                    'url': reverse('notes:detail', args=(note.slug,)),
+                }
+                for note in self.get_queryset()
+            ],
+        })
+
+
+class NoteBulkApi(NoteBase, generic.View):
+    """Пакетное создание, изменение и удаление заметок в формате JSON.
+
+    Тело запроса: ``{"create": [...], "update": [...], "delete": [...]}``.
+    Элементы create и update содержат поля NoteForm, update и delete
+    находят заметку по slug.
+    """
+    raise_exception = True
+
+    def post(self, request, *args, **kwargs):
+        try:
+            results = bulk.apply_batch(request.user, json.loads(request.body))
+        except ValueError as error:
+            return JsonResponse(
+                {'error': str(error)}, status=HTTPStatus.BAD_REQUEST
+            )
+        except IntegrityError:
+            return JsonResponse(
+                {'error': 'Конфликт slug, повторите запрос.'},
+                status=HTTPStatus.CONFLICT,
+            )
+        return JsonResponse(results)
+
+
+class NoteExport(NoteBase, generic.View):
+    """Потоковая выгрузка всех заметок пользователя."""
+
+    def get(self, request, *args, **kwargs):
+        fmt = export.FORMATS.get(kwargs['fmt'])
+        if fmt is None:
+            raise Http404('Неизвестный формат выгрузки.')
+        response = StreamingHttpResponse(
+            export.export_notes(self.get_queryset(), kwargs['fmt']),
+            content_type=fmt.content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{fmt.extension}"'
+        )
+        return response
+
+
+class NoteTaskMixin(NoteBase):
+    """Фоновые задачи пользователя (notes.tasks)."""
+    raise_exception = True
+
+    def get_task(self):
+        try:
+            return NoteTask.objects.get(
+                pk=self.kwargs['pk'], author=self.request.user
+            )
+        except NoteTask.DoesNotExist:
+            raise Http404('Задача не найдена.')
+
+    def describe(self, note_task):
+        data = tasks.describe(note_task)
+        data['url'] = reverse('notes:api_task', args=(note_task.id,))
+        if note_task.kind == 'export' and (
+            note_task.status == NoteTask.Status.DONE
+        ):
+            data['download'] = reverse(
+                'notes:task_download', args=(note_task.id,)
+            )
+        return data
+
+
+class NoteTaskCreateApi(NoteTaskMixin, generic.View):
+    """Ставит в очередь выгрузку, загрузку или переиндексацию заметок.
+
+    Параметры формы: ``kind`` (export, import, reindex), ``format`` и для
+    загрузки файл ``file``. Ответ 202 со статусом задачи и адресом для
+    его опроса.
+    """
+
+    def post(self, request, *args, **kwargs):
+        kind = request.POST.get('kind')
+        get_payload = getattr(self, f'payload_{kind}', None)
+        try:
+            if get_payload is None:
+                raise ValueError(f'Неизвестная задача: {kind}.')
+            payload = get_payload()
+        except ValueError as error:
+            return JsonResponse(
+                {'error': str(error)}, status=HTTPStatus.BAD_REQUEST
+            )
+        note_task = tasks.enqueue(kind, request.user, **payload)
+        return JsonResponse(
+            self.describe(note_task), status=HTTPStatus.ACCEPTED
+        )
+
+    def payload_export(self):
+        fmt = self.request.POST.get('format', 'ndjson')
+        if fmt not in export.FORMATS:
+            raise ValueError('Неизвестный формат выгрузки.')
+        return {'format': fmt}
+
+    def payload_import(self):
+        upload = self.request.FILES.get('file')
+        if upload is None:
+            raise ValueError('Не передан файл с заметками.')
+        fmt = self.request.POST.get('format') or upload.name.rsplit(
+            '.', 1
+        )[-1].lower()
+        if fmt not in imports.FORMATS:
+            raise ValueError('Неизвестный формат файла.')
+        return {'format': fmt, 'path': str(tasks.save_upload(upload, fmt))}
+
+    def payload_reindex(self):
+        return {}
+
+
+class NoteTaskStatusApi(NoteTaskMixin, generic.View):
+    """Статус фоновой задачи пользователя."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(self.describe(self.get_task()))
+
+
+class NoteTaskDownload(NoteTaskMixin, generic.View):
+    """Файл готовой фоновой выгрузки."""
+
+    def get(self, request, *args, **kwargs):
+        note_task = self.get_task()
+        if note_task.kind != 'export' or (
+            note_task.status != NoteTask.Status.DONE
+        ):
+            raise Http404('Выгрузка не готова.')
+        fmt = export.FORMATS[note_task.payload['format']]
+        return FileResponse(
+            tasks.export_path(note_task).open('rb'),
+            as_attachment=True,
+            filename=f'notes.{fmt.extension}',
+            content_type=fmt.content_type,
+        )
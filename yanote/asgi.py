@@ -11,6 +11,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from yanote.template_cache import precompile_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
 application = get_asgi_application()
+precompile_templates()
@@ -0,0 +1,72 @@
+"""Профили хеширования паролей.
+
+* ``default`` — как в Django по умолчанию: PBKDF2;
+* ``production`` — scrypt из стандартной библиотеки с параметрами
+  ``PASSWORD_SCRYPT_*``, подобранными командой ``bench_passwords``;
+* ``fast`` — MD5 для тестов: быстро и небезопасно.
+
+Первый хешер профиля хеширует новые пароли, остальные только проверяют
+старые хеши. При входе Django сам перехеширует пароль, если хеш сделан
+другим хешером или с другими параметрами, поэтому переход между
+профилями и смена параметров scrypt не требуют сброса паролей.
+"""
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+SCRYPT = 'yanote.hashers.ScryptPasswordHasher'
+MD5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+DJANGO_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PROFILES = {
+    'default': [*DJANGO_HASHERS, SCRYPT],
+    'production': [SCRYPT, *DJANGO_HASHERS],
+    'fast': [MD5, *DJANGO_HASHERS, SCRYPT],
+}
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """Scrypt с параметрами из настроек; хеши совместимы с Django."""
+
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2**14)
+
+    @property
+    def block_size(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', 1)
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        # Как в Django, но предел памяти считается по параметрам этого
+        # хеша, а не по текущим настройкам: иначе хеш с work_factor больше
+        # текущего не проверяется.
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            maxmem=maxmem(n, r, p), dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+
+def maxmem(n, r, p):
+    """Предел памяти scrypt для параметров ``n``, ``r``, ``p`` в байтах.
+
+    По умолчанию OpenSSL ограничивает память 32 МиБ, а это меньше, чем
+    нужно уже при work_factor 2**15.
+    """
+    return 2 * 128 * n * r * p
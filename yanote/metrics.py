@@ -0,0 +1,139 @@
+"""Замеры производительности запросов.
+
+``PerformanceMiddleware`` всегда указан в ``MIDDLEWARE``, но при
+``PERFORMANCE_METRICS = False`` отключается при запуске
+(``MiddlewareNotUsed``), поэтому выключенные замеры ничего не стоят.
+Для каждого представления (``notes:list``, ``notes:detail``, …) считаются
+полное время ответа, число и время SQL-запросов и время рендеринга
+шаблона. Значения текущего запроса отдаются в заголовке ``Server-Timing``,
+накопленные значения процесса — в текстовом формате Prometheus на
+``/metrics/``.
+"""
+import threading
+from collections import defaultdict
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNRESOLVED = 'unresolved'
+
+METRICS = (
+    ('requests_total', 'counter', 'Число запросов.'),
+    ('request_duration_seconds_sum', 'counter',
+     'Суммарное время ответа, с.'),
+    ('sql_queries_total', 'counter', 'Число SQL-запросов.'),
+    ('sql_duration_seconds_sum', 'counter',
+     'Суммарное время SQL-запросов, с.'),
+    ('template_duration_seconds_sum', 'counter',
+     'Суммарное время рендеринга шаблонов, с.'),
+)
+
+
+class Registry:
+    """Накопленные значения метрик процесса по представлениям."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(lambda: [0] * len(METRICS))
+
+    def observe(self, view, timing):
+        values = (
+            1, timing.total, timing.queries, timing.sql, timing.template
+        )
+        with self._lock:
+            totals = self._views[view]
+            for index, value in enumerate(values):
+                totals[index] += value
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        with self._lock:
+            views = {
+                view: list(values) for view, values in self._views.items()
+            }
+        lines = []
+        for index, (name, kind, help_text) in enumerate(METRICS):
+            lines.append(f'# HELP yanote_{name} {help_text}')
+            lines.append(f'# TYPE yanote_{name} {kind}')
+            for view, values in sorted(views.items()):
+                lines.append(f'yanote_{name}{{view="{view}"}} {values[index]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class RequestTiming:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.total = self.sql = self.template = 0.0
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка ``connection.execute_wrapper``."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += perf_counter() - started
+            self.queries += 1
+
+    def server_timing(self):
+        return ', '.join((
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.sql * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+        ))
+
+
+class PerformanceMiddleware:
+    """Считает время ответа, SQL и рендеринга шаблонов по представлениям."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFORMANCE_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.performance_timing = RequestTiming()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing))
+            response = self.get_response(request)
+        timing.total = perf_counter() - started
+        match = request.resolver_match
+        registry.observe(match.view_name if match else UNRESOLVED, timing)
+        response.headers['Server-Timing'] = timing.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        timing = request.performance_timing
+        started = perf_counter()
+
+        def rendered(response):
+            timing.template += perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    """Метрики процесса для Prometheus."""
+    allowed = getattr(settings, 'PERFORMANCE_METRICS_ALLOWED_IPS', ())
+    if (
+        not getattr(settings, 'PERFORMANCE_METRICS', False)
+        or request.META.get('REMOTE_ADDR') not in allowed
+    ):
+        raise Http404
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,114 @@
+"""Чтение заметок с реплик базы данных.
+
+``ReplicaRouter`` отправляет все записи в ``default``, а чтения — на одну
+из баз ``DATABASE_REPLICAS``, но только внутри ``read_from_replica()``.
+Так на реплики уходят лишь GET-запросы к спискам и страницам заметок;
+формы, проверки уникальности и удаление читают с основной базы.
+
+После изменения чтения пользователя ``REPLICA_STICKY_SECONDS`` секунд
+идут в ``default``: он сразу видит свои изменения со всех устройств, даже
+если реплика отстаёт, а отставшие данные не попадают в общий кеш заметок
+под новую версию. Время изменения хранится в кеше (``mark_written``:
+его вызывают ``ReplicaMiddleware`` и сброс кеша заметок), поэтому кеш
+должен быть общим для всех процессов. Анонимному клиенту
+``ReplicaMiddleware`` ставит cookie на тот же срок.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from random import choice
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = 'default'
+STICKY_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+WRITTEN_KEY = 'replicas:written:{user_id}'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+def mark_written(user_id):
+    """Отмечает изменение данных пользователя: его чтения — в default."""
+    if get_replicas():
+        cache.set(
+            WRITTEN_KEY.format(user_id=user_id), True, get_sticky_seconds()
+        )
+
+
+def is_sticky(request):
+    """Клиент или пользователь недавно что-то изменил: читать из default."""
+    if STICKY_COOKIE in request.COOKIES:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(
+        user is not None and user.is_authenticated
+        and cache.get(WRITTEN_KEY.format(user_id=user.id))
+    )
+
+
+@contextmanager
+def read_from_replica(request):
+    """Чтения внутри блока идут на реплики, если запрос это допускает."""
+    if request.method not in SAFE_METHODS or is_sticky(request):
+        yield
+        return
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Записи — в основную базу, чтения в read_from_replica() — в реплики."""
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replicas and _replica_reads.get():
+            return choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        databases = {PRIMARY, *get_replicas()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaMiddleware:
+    """После изменяющих запросов отправляет чтения клиента в ``default``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return response
+        if request.user.is_authenticated:
+            mark_written(request.user.id)
+        else:
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=get_sticky_seconds(),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.metrics.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,6 +32,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Замеры времени запросов (yanote.metrics): заголовок Server-Timing и
+# /metrics/ для Prometheus. Выключенные замеры отключают свой middleware
+# при запуске, поэтому их можно включить в любом профиле настроек.
+PERFORMANCE_METRICS = False
+PERFORMANCE_METRICS_ALLOWED_IPS = ['127.0.0.1']
+
 ROOT_URLCONF = 'yanote.urls'
 
 TEMPLATES = [
@@ -60,6 +67,63 @@ DATABASES = {
 }
 
 
+# Кеш заметок (notes.cache). Для нескольких процессов или серверов
+# замените бэкенд, например, на django.core.cache.backends.redis.RedisCache
+# или django.core.cache.backends.filebased.FileBasedCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanote',
+    }
+}
+
+NOTES_CACHE_TIMEOUT = 300
+
+# Асинхронные представления заметок (notes.async_views) для запуска под
+# ASGI-сервером, например uvicorn yanote.asgi:application.
+NOTES_ASYNC_VIEWS = False
+
+# Наибольшее число элементов в одном запросе к пакетному API заметок.
+NOTES_API_BATCH_SIZE = 1000
+
+# Тексты заметок длиннее этого числа байт хранятся сжатыми (notes.fields).
+NOTES_COMPRESS_THRESHOLD = 1024
+
+# Фоновые задачи (notes.tasks, manage.py run_note_worker): каталог
+# файлов, число попыток, задержка первого повтора и время, после которого
+# задача зависшего исполнителя отдаётся другому, в секундах.
+NOTES_TASK_ROOT = BASE_DIR / 'task_files'
+NOTES_TASK_MAX_ATTEMPTS = 5
+NOTES_TASK_RETRY_DELAY = 10
+NOTES_TASK_TIMEOUT = 600
+
+# Ограничение частоты изменений заметок (notes.throttling): до
+# NOTES_THROTTLE_BURST запросов подряд, затем NOTES_THROTTLE_RATE в секунду
+# на пользователя. LocalBuckets считает в памяти каждого процесса,
+# notes.throttling.CacheBuckets — в кеше, общем для всех процессов.
+NOTES_THROTTLE_BACKEND = 'notes.throttling.LocalBuckets'
+NOTES_THROTTLE_RATE = 1
+NOTES_THROTTLE_BURST = 10
+# Сколько секунд хранится ответ на запрос с заголовком Idempotency-Key.
+NOTES_IDEMPOTENCY_TIMEOUT = 24 * 60 * 60
+
+# Заметки удаляются физически фоновой задачей purge (notes.purge) порциями
+# по столько строк.
+NOTES_PURGE_BATCH_SIZE = 500
+
+# Сессии читаются из кеша и только при промахе из БД. Кеш должен быть
+# общим для всех процессов (см. CACHES в settings_production): с
+# LocMemCache выход и смена пароля сбрасывают сессию и пользователя только
+# в процессе, который их обработал. Без записей в БД
+# можно хранить сессию в подписанной cookie:
+# SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь сессии тоже берётся из кеша (notes.auth).
+AUTHENTICATION_BACKENDS = ['notes.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 300
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
@@ -82,6 +146,15 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# Сюда collectstatic собирает файлы для боевого сервера.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Раздавать STATIC_ROOT самим Django (yanote.staticfiles.serve), если
+# перед ним нет веб-сервера.
+SERVE_STATIC = False
+
+# Компилировать все шаблоны при запуске (yanote.template_cache).
+TEMPLATES_PRECOMPILE = False
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,29 @@
+"""Профиль с репликой базы данных для чтения (см. yanote.replicas).
+
+Запуск: ``DJANGO_SETTINGS_MODULE=yanote.settings_replica``.
+
+Локально основную базу и реплику заменяют два файла SQLite. Реплику
+нужно заполнить самостоятельно, например копией основной базы::
+
+    python manage.py migrate
+    sqlite3 db.sqlite3 ".backup replica.sqlite3"
+
+В тестах реплика — зеркало основной базы.
+"""
+from yanote.settings import *  # noqa: F401,F403
+from yanote.settings import BASE_DIR, DATABASES, MIDDLEWARE
+
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['yanote.replicas.ReplicaRouter']
+DATABASE_REPLICAS = ['replica']
+# Сколько секунд после изменения пользователь читает с основной базы.
+# Должно быть больше задержки репликации. Отметка об изменении хранится в
+# CACHES['default'], который должен быть общим для всех процессов.
+REPLICA_STICKY_SECONDS = 5
+
+MIDDLEWARE.append('yanote.replicas.ReplicaMiddleware')
@@ -0,0 +1,12 @@
+"""Профиль для тестов.
+
+Включается автоматически: ``pytest.ini`` и ``python manage.py test``.
+Пароли хешируются MD5 — на порядки быстрее PBKDF2, что заметно на
+фикстурах с пользователями. Лимит частоты изменений заметок не мешает
+тестам, которые быстро отправляют много форм.
+"""
+from yanote.hashers import PROFILES
+from yanote.settings import *  # noqa: F401,F403
+
+PASSWORD_HASHERS = PROFILES['fast']
+NOTES_THROTTLE_BURST = 1_000_000
@@ -0,0 +1,40 @@
+"""Настройки SQLite для нагруженного сервера.
+
+Прагмы выполняются при открытии каждого соединения (``init_command``
+бэкенда SQLite в Django 5.1+):
+
+* ``journal_mode=WAL`` — читатели не блокируют писателя и наоборот;
+* ``synchronous=NORMAL`` — в режиме WAL fsync только при checkpoint,
+  коммит не теряет целостности при падении процесса;
+* ``cache_size`` и ``mmap_size`` — страницы БД в памяти процесса;
+* ``busy_timeout`` — ожидание блокировки вместо мгновенной ошибки.
+
+``transaction_mode=IMMEDIATE`` берёт блокировку записи в начале
+транзакции: транзакция, начавшая с чтения, не получит ``database is
+locked`` при переходе к записи.
+"""
+BUSY_TIMEOUT_SECONDS = 20
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Отрицательное значение — размер в КиБ: 64 МиБ.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': BUSY_TIMEOUT_SECONDS * 1000,
+    'temp_store': 'MEMORY',
+}
+
+
+def init_command(pragmas=PRAGMAS):
+    """SQL, выполняемый при открытии соединения."""
+    return ' '.join(
+        f'PRAGMA {name}={value};' for name, value in pragmas.items()
+    )
+
+
+OPTIONS = {
+    'init_command': init_command(),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': BUSY_TIMEOUT_SECONDS,
+}
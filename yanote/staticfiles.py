@@ -0,0 +1,67 @@
+"""Статические файлы без CDN.
+
+``MinifiedManifestStaticFilesStorage`` при ``collectstatic`` сжимает
+CSS проекта и добавляет в имена файлов хеш содержимого
+(``css/yanote.3f2a9c1b7d4e.css``). Файл с хешем в имени никогда не
+меняется, поэтому ``serve`` отдаёт такие файлы с кешированием на год.
+"""
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.cache import patch_cache_control
+from django.views import static
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_SPACE_RE = re.compile(r'\s+')
+_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(css):
+    """Удаляет из CSS комментарии и лишние пробелы."""
+    css = _COMMENT_RE.sub('', css)
+    css = _SPACE_RE.sub(' ', css)
+    css = _PUNCTUATION_RE.sub(r'\1', css)
+    # Пробел перед двоеточием значим в селекторах («a :hover»).
+    css = css.replace(': ', ':').replace(';}', '}')
+    return css.strip()
+
+
+class MinifiedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage, который сначала сжимает CSS проекта."""
+    # CSS сторонних приложений (например, admin/css/) не трогаем.
+    minify_prefixes = ('css/',)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for path in paths:
+                if path.endswith('.css') and path.startswith(
+                    self.minify_prefixes
+                ):
+                    self.minify(path)
+                    # Хеш считается по сжатой копии из STATIC_ROOT.
+                    paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def minify(self, path):
+        with self.open(path) as css_file:
+            css = css_file.read().decode()
+        self.delete(path)
+        self._save(path, ContentFile(minify_css(css).encode()))
+
+
+def serve(request, path):
+    """Отдаёт файл из STATIC_ROOT; файлы с хешем — с кешем на год."""
+    response = static.serve(request, path, document_root=settings.STATIC_ROOT)
+    if HASHED_NAME_RE.search(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,39 @@
+"""Предварительная компиляция шаблонов.
+
+С кеширующим загрузчиком (``django.template.loaders.cached.Loader``)
+шаблон компилируется при первом обращении к нему. При
+``TEMPLATES_PRECOMPILE = True`` wsgi.py и asgi.py компилируют все шаблоны
+при запуске процесса: первые запросы не платят за компиляцию, а ошибка в
+шаблоне видна сразу, а не на первом запросе к странице.
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def iter_template_names(engine):
+    """Имена всех шаблонов в каталогах загрузчиков движка."""
+    for loader in engine.template_loaders:
+        for inner_loader in getattr(loader, 'loaders', (loader,)):
+            for directory in map(Path, inner_loader.get_dirs()):
+                for path in directory.rglob('*'):
+                    if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                        yield path.relative_to(directory).as_posix()
+
+
+def precompile_templates():
+    """Компилирует все шаблоны Django и возвращает их число."""
+    if not getattr(settings, 'TEMPLATES_PRECOMPILE', False):
+        return 0
+    compiled = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for name in sorted(set(iter_template_names(engine))):
+            backend.get_template(name)
+            compiled += 1
+    return compiled
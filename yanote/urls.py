@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.views.generic import CreateView
 
+from yanote import staticfiles
+from yanote.metrics import metrics_view
+
 urlpatterns = [
     path('', include('notes.urls')),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 auth_urls = ([
@@ -34,3 +39,12 @@ auth_urls = ([
 ], 'users')
 
 urlpatterns += [path('auth/', include(auth_urls))]
+
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(
+            rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.*)$',
+            staticfiles.serve,
+            name='static',
+        ),
+    ]